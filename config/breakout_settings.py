@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Dict, List
 from config.settings import Sector
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BreakoutConfig:
     # Core breakout parameters
     min_breakout_percentage: float = 2.0
@@ -29,7 +29,7 @@ class BreakoutConfig:
     breakout_end_minute: int = 30
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MultiStrategyConfig:
     # Portfolio allocation
     gap_up_allocation: float = 0.6  # 60% for gap-up strategy
@@ -0,0 +1,52 @@
+# config/config_store.py
+
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+
+class ConfigStore:
+    """Caches parsed config sources and re-parses only when they change"""
+
+    def __init__(self):
+        self._mtimes: Dict[Path, int] = {}
+        self._cached: Dict[Path, Any] = {}
+
+    def load(self, path: Union[str, Path], parser: Callable[[Path], Any]) -> Any:
+        """Return parsed contents of path, skipping the parse if its mtime is unchanged"""
+        path = Path(path)
+        mtime = os.stat(path).st_mtime_ns
+
+        if self._mtimes.get(path) == mtime:
+            return self._cached[path]
+
+        value = parser(path)
+        self._cached[path] = value
+        self._mtimes[path] = mtime
+        return value
+
+    def invalidate(self, path: Optional[Union[str, Path]] = None):
+        """Forget one cached file, or all of them"""
+        if path is None:
+            self._mtimes.clear()
+            self._cached.clear()
+        else:
+            self._mtimes.pop(Path(path), None)
+            self._cached.pop(Path(path), None)
+
+
+_env_cache_clears: List[Callable[[], None]] = []
+
+
+def env_cached(loader: Callable[[], Any]) -> Callable[[], Any]:
+    """Cache an environment-derived config loader until invalidate_env_configs() is called"""
+    cached = lru_cache(maxsize=1)(loader)
+    _env_cache_clears.append(cached.cache_clear)
+    return cached
+
+
+def invalidate_env_configs() -> None:
+    """Drop every env_cached config so the next load re-reads the environment"""
+    for cache_clear in _env_cache_clears:
+        cache_clear()
@@ -1,11 +1,23 @@
 # config/scalping_settings.py
 
 from dataclasses import dataclass
-from typing import Dict, List
-from config.settings import Sector
+from typing import ClassVar, Dict, FrozenSet, Tuple
+from config.settings import EnvSchema, Sector, parse_bool
 
+# Most liquid stocks suitable for scalping
+_DEFAULT_PREFERRED_SYMBOLS = (
+    'RELIANCE.NS', 'TCS.NS', 'HDFCBANK.NS', 'INFY.NS',
+    'ICICIBANK.NS', 'ITC.NS', 'SBIN.NS', 'HINDUNILVR.NS',
+    'LT.NS', 'AXISBANK.NS', 'BAJFINANCE.NS', 'MARUTI.NS'
+)
 
-@dataclass
+# Avoid low liquidity or highly volatile stocks
+_DEFAULT_AVOID_SYMBOLS = (
+    'SUZLON.NS', 'YESBANK.NS', 'RPOWER.NS'  # Example low-quality stocks
+)
+
+
+@dataclass(slots=True, frozen=True)
 class ScalpingConfig:
     """Configuration for Level II Scalping Strategy"""
 
@@ -50,26 +62,16 @@ class ScalpingConfig:
     profit_target_multiplier: float = 3.0  # Take profits at 3x average win
 
     # Symbol-specific settings
-    preferred_symbols: List[str] = None  # Will be set in __post_init__
-    avoid_symbols: List[str] = None  # Symbols to avoid for scalping
-
-    def __post_init__(self):
-        if self.preferred_symbols is None:
-            # Most liquid stocks suitable for scalping
-            self.preferred_symbols = [
-                'RELIANCE.NS', 'TCS.NS', 'HDFCBANK.NS', 'INFY.NS',
-                'ICICIBANK.NS', 'ITC.NS', 'SBIN.NS', 'HINDUNILVR.NS',
-                'LT.NS', 'AXISBANK.NS', 'BAJFINANCE.NS', 'MARUTI.NS'
-            ]
-
-        if self.avoid_symbols is None:
-            # Avoid low liquidity or highly volatile stocks
-            self.avoid_symbols = [
-                'SUZLON.NS', 'YESBANK.NS', 'RPOWER.NS'  # Example low-quality stocks
-            ]
-
-
-@dataclass
+    # Frozensets for O(1) membership checks on the tick path
+    preferred_symbols: FrozenSet[str] = frozenset(_DEFAULT_PREFERRED_SYMBOLS)
+    avoid_symbols: FrozenSet[str] = frozenset(_DEFAULT_AVOID_SYMBOLS)
+
+    # Ordered copies of the defaults for display
+    preferred_symbols_ordered: ClassVar[Tuple[str, ...]] = _DEFAULT_PREFERRED_SYMBOLS
+    avoid_symbols_ordered: ClassVar[Tuple[str, ...]] = _DEFAULT_AVOID_SYMBOLS
+
+
+@dataclass(slots=True, frozen=True)
 class MultiStrategyScalpingConfig:
     """Configuration for integrating scalping with existing strategies"""
 
@@ -92,4 +94,23 @@ class MultiStrategyScalpingConfig:
     # Scalping-specific integration rules
     allow_scalping_during_signals: bool = False  # Don't scalp during other strategy signals
     scalping_priority: int = 3  # Lower priority than main strategies
-    cross_strategy_cooldown_minutes: int = 5  # Cooldown after other strategy trades
\ No newline at end of file
+    cross_strategy_cooldown_minutes: int = 5  # Cooldown after other strategy trades
+
+
+# (env var, field, cast, default) tables for the environment-driven settings
+SCALPING_ENV_SCHEMA: EnvSchema = (
+    ('SCALPING_MIN_IMBALANCE', 'min_bid_ask_imbalance_ratio', float, 2.5),
+    ('SCALPING_MIN_VOLUME', 'min_volume_at_level', int, 2000),
+    ('SCALPING_MAX_POSITIONS', 'max_positions', int, 1),
+    ('SCALPING_POSITION_SIZE', 'position_size_percentage', float, 0.15),
+    ('SCALPING_STOP_TICKS', 'stop_loss_ticks', int, 3),
+    ('SCALPING_TARGET_TICKS', 'target_ticks', int, 6),
+    ('SCALPING_MAX_HOLD', 'max_hold_seconds', int, 45),
+    ('SCALPING_COOLDOWN', 'cooldown_seconds', int, 120),
+    ('SCALPING_MIN_CONFIDENCE', 'min_confidence', float, 0.80),
+)
+
+MULTI_SCALPING_ENV_SCHEMA: EnvSchema = (
+    ('ALLOW_SCALPING_DURING_SIGNALS', 'allow_scalping_during_signals', parse_bool, False),
+    ('CROSS_STRATEGY_COOLDOWN', 'cross_strategy_cooldown_minutes', int, 5),
+)
@@ -1,8 +1,22 @@
 import os
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
 from enum import Enum
 
+_env_loaded = False
+
+
+def load_env_once() -> None:
+    """Load .env on first use; variables already set in the shell take precedence"""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+
+    from dotenv import load_dotenv
+    load_dotenv(override=False)
+
+
 class Sector(Enum):
     FMCG = "FMCG"
     IT = "IT"
@@ -12,7 +26,7 @@ class Sector(Enum):
     METALS = "METALS"
     REALTY = "REALTY"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FyersConfig:
     client_id: str
     secret_key: str
@@ -21,7 +35,7 @@ class FyersConfig:
     base_url: str = "https://api-t1.fyers.in/api/v3"
     base_url_v1: str = "https://api-t1.fyers.in"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class StrategyConfig:
     portfolio_value: float = 1000000
     risk_per_trade_pct: float = 1.0
@@ -33,7 +47,7 @@ class StrategyConfig:
     stop_loss_pct: float = 1.5
     target_pct: float = 3.0
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TradingConfig:
     market_start_hour: int = 9
     market_start_minute: int = 15
@@ -42,4 +56,44 @@ class TradingConfig:
     signal_generation_end_hour: int = 10
     signal_generation_end_minute: int = 30
     monitoring_interval: int = 1
-    execution_delay: int = 5
\ No newline at end of file
+    execution_delay: int = 5
+    max_concurrent_orders: int = 3  # Orders in flight at once; each holds its slot for execution_delay
+
+
+# (env var, dataclass field, cast, default) - default is used as-is when the var is unset
+EnvSchema = Tuple[Tuple[str, str, Callable[[str], Any], Any], ...]
+
+FYERS_ENV_SCHEMA: EnvSchema = (
+    ('FYERS_CLIENT_ID', 'client_id', str, None),
+    ('FYERS_SECRET_KEY', 'secret_key', str, None),
+    ('FYERS_REDIRECT_URI', 'redirect_uri', str, 'https://trade.fyers.in/api-login/redirect-to-app'),
+    ('FYERS_ACCESS_TOKEN', 'access_token', str, None),
+)
+
+STRATEGY_ENV_SCHEMA: EnvSchema = (
+    ('PORTFOLIO_VALUE', 'portfolio_value', float, 1000000.0),
+    ('RISK_PER_TRADE', 'risk_per_trade_pct', float, 1.0),
+    ('MAX_POSITIONS', 'max_positions', int, 3),
+    ('MIN_GAP_PERCENTAGE', 'min_gap_percentage', float, 0.5),
+    ('MIN_SELLING_PRESSURE', 'min_selling_pressure', float, 40.0),
+    ('MIN_VOLUME_RATIO', 'min_volume_ratio', float, 1.2),
+    ('MIN_CONFIDENCE', 'min_confidence', float, 0.6),
+    ('STOP_LOSS_PCT', 'stop_loss_pct', float, 1.5),
+    ('TARGET_PCT', 'target_pct', float, 3.0),
+)
+
+
+_TRUE_STRINGS = frozenset(('1', 'true', 'yes', 'on'))
+
+
+def parse_bool(raw: str) -> bool:
+    """Parse an environment flag; bool() would treat any non-empty string, even "False", as True"""
+    return raw.strip().lower() in _TRUE_STRINGS
+
+
+def parse_env(schema: EnvSchema, env: Mapping[str, str]) -> Dict[str, Any]:
+    """Coerce environment values into dataclass keyword arguments using a schema"""
+    return {
+        field: default if (raw := env.get(name)) is None else cast(raw)
+        for name, field, cast, default in schema
+    }
@@ -6,12 +6,20 @@ This script demonstrates how to integrate and use the scalping strategy
 """
 
 import asyncio
+import json
 import logging
 from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
 
 # Import the enhanced system
 from main_enhanced_scalping import EnhancedMultiStrategyWithScalping, load_enhanced_config
 from config.scalping_settings import ScalpingConfig
+from config.config_store import ConfigStore
+from utils.event_loop import run_coroutine
 
 # Configure logging for the example
 logging.basicConfig(level=logging.INFO)
@@ -57,38 +65,40 @@ class ScalpingExample:
 
         # Sample symbols for demonstration
         demo_symbols = ['RELIANCE.NS', 'TCS.NS', 'HDFCBANK.NS']
-
-        for symbol in demo_symbols:
-            try:
-                print(f"\nAnalyzing {symbol}:")
-
-                # Get order book data
-                order_book = await self.system.fyers_service.get_market_depth(symbol)
-
-                if order_book:
-                    print(f"  ✓ Order book depth: {len(order_book.bids)} bids, {len(order_book.asks)} asks")
-                    print(f"  ✓ Spread: Rs.{order_book.spread:.2f}")
-                    print(f"  ✓ Mid price: Rs.{order_book.mid_price:.2f}")
-
-                    # Analyze imbalance
-                    imbalance = self.system.fyers_service.analyze_order_book_imbalance(order_book)
-                    print(f"  ✓ Bid/Ask imbalance ratio: {imbalance['imbalance_ratio']:.2f}")
-
-                    # Identify key levels
-                    levels = self.system.fyers_service.identify_support_resistance_levels(order_book)
-                    print(f"  ✓ Support levels: {len(levels['support_levels'])}")
-                    print(f"  ✓ Resistance levels: {len(levels['resistance_levels'])}")
-
-                    # Check scalping conditions
-                    conditions = self.system.fyers_service.check_scalping_conditions(order_book, [])
-                    suitable = sum(conditions.values())
-                    print(f"  ✓ Scalping suitability: {suitable}/5 conditions met")
-
-                else:
-                    print(f"  ✗ No order book data available for {symbol}")
-
-            except Exception as e:
-                print(f"  ✗ Error analyzing {symbol}: {e}")
+        fyers_service = self.system.fyers_service
+        limiter = asyncio.Semaphore(5)  # Stay within broker rate limits
+
+        async def _analyze_one(symbol: str) -> list:
+            async with limiter:
+                order_book = await fyers_service.get_market_depth(symbol)
+
+            if not order_book:
+                return [f"  ✗ No order book data available for {symbol}"]
+
+            imbalance = fyers_service.analyze_order_book_imbalance(order_book)
+            levels = fyers_service.identify_support_resistance_levels(order_book)
+            conditions = fyers_service.check_scalping_conditions(order_book, [])
+            suitable = sum(conditions.values())
+
+            return [
+                f"  ✓ Order book depth: {len(order_book.bids)} bids, {len(order_book.asks)} asks",
+                f"  ✓ Spread: Rs.{order_book.spread:.2f}",
+                f"  ✓ Mid price: Rs.{order_book.mid_price:.2f}",
+                f"  ✓ Bid/Ask imbalance ratio: {imbalance['imbalance_ratio']:.2f}",
+                f"  ✓ Support levels: {len(levels['support_levels'])}",
+                f"  ✓ Resistance levels: {len(levels['resistance_levels'])}",
+                f"  ✓ Scalping suitability: {suitable}/5 conditions met",
+            ]
+
+        # Fetch all order books concurrently, then report in symbol order
+        results = await asyncio.gather(*[_analyze_one(s) for s in demo_symbols], return_exceptions=True)
+
+        for symbol, result in zip(demo_symbols, results):
+            print(f"\nAnalyzing {symbol}:")
+            if isinstance(result, Exception):
+                print(f"  ✗ Error analyzing {symbol}: {result}")
+            else:
+                print("\n".join(result))
 
     async def demo_signal_generation(self):
         """Demonstrate scalping signal generation"""
@@ -131,9 +141,9 @@ class ScalpingExample:
         print("\n=== Strategy Coordination Demo ===")
 
         # Show current strategy status
-        gap_up_positions = len(self.system.gap_up_strategy.positions)
-        breakout_positions = len(self.system.breakout_strategy.positions)
-        scalping_positions = len(self.system.scalping_strategy.positions)
+        gap_up_positions = self.system.gap_up_strategy.active_position_count
+        breakout_positions = self.system.breakout_strategy.active_position_count
+        scalping_positions = self.system.scalping_strategy.active_position_count
 
         print(f"Current positions:")
         print(f"  Gap-Up Strategy: {gap_up_positions}")
@@ -159,14 +169,14 @@ class ScalpingExample:
         performance = self.system.get_comprehensive_performance()
 
         print("Portfolio Summary:")
-        portfolio = performance['portfolio_summary']
-        print(f"  Total P&L: Rs.{portfolio['total_pnl']:.2f}")
-        print(f"  Daily P&L: Rs.{portfolio['daily_pnl']:.2f}")
-        print(f"  Total Positions: {portfolio['total_positions']}")
-        print(f"  Active Strategies: {portfolio['strategies_active']}")
+        portfolio = performance.portfolio_summary
+        print(f"  Total P&L: Rs.{portfolio.total_pnl:.2f}")
+        print(f"  Daily P&L: Rs.{portfolio.daily_pnl:.2f}")
+        print(f"  Total Positions: {portfolio.total_positions}")
+        print(f"  Active Strategies: {portfolio.strategies_active}")
 
         print("\nStrategy Breakdown:")
-        strategies = performance['strategy_breakdown']
+        strategies = performance.strategy_breakdown
         for strategy_name, stats in strategies.items():
             print(f"  {strategy_name.title()}:")
             print(f"    Positions: {stats['active_positions']}")
@@ -175,12 +185,11 @@ class ScalpingExample:
                 print(f"    Trades Today: {stats['trades_today']}")
 
         print("\nRisk Metrics:")
-        risk_metrics = performance['risk_metrics']
-        print(f"  Position Distribution: {risk_metrics['position_distribution']}")
-        if 'scalping_metrics' in risk_metrics:
-            scalping = risk_metrics['scalping_metrics']
-            print(f"  Scalping Frequency: {scalping['scalping_frequency']}")
-            print(f"  Avg Hold Time: {scalping['avg_hold_time']}")
+        risk_metrics = performance.risk_metrics
+        print(f"  Position Distribution: {risk_metrics.position_distribution}")
+        scalping = risk_metrics.scalping_metrics
+        print(f"  Scalping Frequency: {scalping.scalping_frequency}")
+        print(f"  Avg Hold Time: {scalping.avg_hold_time}")
 
     async def run_demo(self):
         """Run the complete demonstration"""
@@ -220,41 +229,45 @@ async def run_live_scalping_example():
             config['multi_strategy_scalping']
         )
 
-        # Initialize
-        if not await system.initialize():
-            print("❌ Failed to initialize system")
-            return
-
-        print("✅ System initialized. Running for 10 minutes...")
-
-        # Run for 10 minutes as example
-        import time
-        start_time = time.time()
-        cycle_count = 0
-
-        while time.time() - start_time < 600:  # 10 minutes
-            cycle_count += 1
-            print(f"\n--- Cycle {cycle_count} ---")
-
-            # Run one strategy cycle
-            await system.run_all_strategies_with_scalping()
+        # The system runs its own long-lived strategy tasks; this loop only reports on them
+        loop = asyncio.get_running_loop()
+        run_task = asyncio.create_task(system.run())
+        print("✅ System started. Running for 10 minutes...")
 
-            # Show quick status
-            scalping_perf = system.scalping_strategy.get_scalping_performance()
-            print(f"Scalping: {scalping_perf['active_positions']} positions, "
-                  f"{scalping_perf['trades_today']} trades today")
+        # Report every 10 seconds on the monotonic loop clock
+        report_interval = 10
+        deadline = loop.time() + 600
+        next_tick = loop.time()
+        report_count = 0
 
-            # Sleep for next cycle
-            await asyncio.sleep(10)  # 10 seconds between cycles
+        try:
+            while loop.time() < deadline:
+                # Sleep until the next scheduled report, not a fixed delay after this one
+                next_tick += report_interval
+                await asyncio.wait({run_task}, timeout=max(0, next_tick - loop.time()))
+                if run_task.done():
+                    print("❌ System stopped early (initialization failed or fatal error)")
+                    return
+
+                report_count += 1
+                print(f"\n--- Status {report_count} ---")
+
+                # Show quick status
+                scalping_perf = system.scalping_strategy.get_scalping_performance()
+                print(f"Scalping: {scalping_perf['active_positions']} positions, "
+                      f"{scalping_perf['trades_today']} trades today")
+        finally:
+            run_task.cancel()
+            await asyncio.gather(run_task, return_exceptions=True)
 
         print("\n🏁 Live scalping example completed!")
 
         # Final performance summary
         final_performance = system.get_comprehensive_performance()
         print("\nFinal Performance Summary:")
-        print(f"Total P&L: Rs.{final_performance['portfolio_summary']['total_pnl']:.2f}")
+        print(f"Total P&L: Rs.{final_performance.portfolio_summary.total_pnl:.2f}")
 
-        scalping_stats = final_performance['strategy_breakdown']['level2_scalping']
+        scalping_stats = final_performance.strategy_breakdown['level2_scalping']
         print(f"Scalping Trades: {scalping_stats.get('trades_today', 0)}")
         print(f"Scalping P&L: Rs.{scalping_stats['daily_pnl']:.2f}")
 
@@ -264,10 +277,41 @@ async def run_live_scalping_example():
         print(f"❌ Error in live example: {e}")
 
 
+# Shared default profile (ScalpingConfig is frozen, so one instance is safe to reuse)
+DEFAULT_SCALPING_CONFIG = ScalpingConfig()
+
+# Risk factors: position size > 0.2, stop < 3 ticks, positions > 1, confidence < 0.75
+_RISK_FIELDS = ('position_size_percentage', 'stop_loss_ticks', 'max_positions', 'min_confidence')
+_RISK_THRESHOLDS = np.array([0.2, 3.0, 1.0, 0.75])
+_RISK_SIGNS = np.array([1.0, -1.0, 1.0, -1.0])
+_RISK_LEVELS = ('Low', 'Medium', 'High')
+
+# Frequency factors: each setting at or below its limit makes trades more frequent
+_FREQUENCY_FIELDS = ('min_bid_ask_imbalance_ratio', 'min_confidence', 'cooldown_seconds', 'min_volume_at_level')
+_FREQUENCY_LIMITS = np.array([2.5, 0.8, 120.0, 2000.0])
+_FREQUENCY_LEVELS = ('Low (3-8 trades/day)', 'Medium (8-15 trades/day)', 'High (15-25 trades/day)')
+
+_RECOMMENDATIONS = (
+    'Consider increasing target_ticks for better risk-reward',
+    'Consider reducing position size for better risk management',
+    'Consider shorter hold times for true scalping'
+)
+
+
 class ScalpingConfigurationHelper:
     """Helper class for configuring scalping parameters"""
 
+    _profile_store = ConfigStore()
+
+    @staticmethod
+    def load_profile(path) -> ScalpingConfig:
+        """Load a JSON scalping profile, re-parsing only when the file changes"""
+        return ScalpingConfigurationHelper._profile_store.load(
+            path, lambda p: ScalpingConfig(**json.loads(Path(p).read_text()))
+        )
+
     @staticmethod
+    @lru_cache(maxsize=None)
     def create_conservative_config() -> ScalpingConfig:
         """Create conservative scalping configuration"""
         return ScalpingConfig(
@@ -283,6 +327,7 @@ class ScalpingConfigurationHelper:
         )
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def create_aggressive_config() -> ScalpingConfig:
         """Create aggressive scalping configuration"""
         return ScalpingConfig(
@@ -300,63 +345,42 @@ class ScalpingConfigurationHelper:
     @staticmethod
     def analyze_config_impact(config: ScalpingConfig) -> dict:
         """Analyze the impact of configuration settings"""
-        analysis = {
-            'risk_level': 'Unknown',
-            'expected_frequency': 'Unknown',
-            'capital_efficiency': 'Unknown',
-            'recommendations': []
-        }
-
-        # Analyze risk level
-        risk_factors = []
-        if config.position_size_percentage > 0.2:
-            risk_factors.append('High position size')
-        if config.stop_loss_ticks < 3:
-            risk_factors.append('Very tight stops')
-        if config.max_positions > 1:
-            risk_factors.append('Multiple positions')
-        if config.min_confidence < 0.75:
-            risk_factors.append('Lower confidence threshold')
-
-        if len(risk_factors) >= 3:
-            analysis['risk_level'] = 'High'
-        elif len(risk_factors) >= 1:
-            analysis['risk_level'] = 'Medium'
-        else:
-            analysis['risk_level'] = 'Low'
-
-        # Analyze expected frequency
-        frequency_factors = 0
-        if config.min_bid_ask_imbalance_ratio <= 2.5:
-            frequency_factors += 1
-        if config.min_confidence <= 0.8:
-            frequency_factors += 1
-        if config.cooldown_seconds <= 120:
-            frequency_factors += 1
-        if config.min_volume_at_level <= 2000:
-            frequency_factors += 1
-
-        if frequency_factors >= 3:
-            analysis['expected_frequency'] = 'High (15-25 trades/day)'
-        elif frequency_factors >= 2:
-            analysis['expected_frequency'] = 'Medium (8-15 trades/day)'
-        else:
-            analysis['expected_frequency'] = 'Low (3-8 trades/day)'
+        return ScalpingConfigurationHelper.analyze_config_batch([config])[0]
 
-        # Calculate risk-reward ratio
-        rr_ratio = config.target_ticks / config.stop_loss_ticks
-
-        # Generate recommendations
-        if rr_ratio < 1.5:
-            analysis['recommendations'].append('Consider increasing target_ticks for better risk-reward')
-        if config.position_size_percentage > 0.2:
-            analysis['recommendations'].append('Consider reducing position size for better risk management')
-        if config.max_hold_seconds > 45:
-            analysis['recommendations'].append('Consider shorter hold times for true scalping')
-
-        analysis['risk_reward_ratio'] = f"1:{rr_ratio:.1f}"
-
-        return analysis
+    @staticmethod
+    def analyze_config_batch(configs: List[ScalpingConfig]) -> List[dict]:
+        """Analyze many configurations at once with vectorized threshold checks"""
+        if not configs:
+            return []
+
+        def _columns(fields: Tuple[str, ...]) -> np.ndarray:
+            return np.array([[getattr(config, name) for name in fields] for config in configs], dtype=np.float64)
+
+        # Risk factors: signed comparison handles both "above" and "below" thresholds
+        risk_counts = (_columns(_RISK_FIELDS) * _RISK_SIGNS > _RISK_THRESHOLDS * _RISK_SIGNS).sum(axis=1)
+        frequency_counts = (_columns(_FREQUENCY_FIELDS) <= _FREQUENCY_LIMITS).sum(axis=1)
+
+        extra = _columns(('target_ticks', 'stop_loss_ticks', 'position_size_percentage', 'max_hold_seconds'))
+        rr_ratios = extra[:, 0] / extra[:, 1]
+        recommendation_mask = np.column_stack((
+            rr_ratios < 1.5,
+            extra[:, 2] > 0.2,
+            extra[:, 3] > 45
+        ))
+
+        risk_index = (risk_counts >= 1).astype(np.int8) + (risk_counts >= 3)
+        frequency_index = (frequency_counts >= 2).astype(np.int8) + (frequency_counts >= 3)
+
+        return [
+            {
+                'risk_level': _RISK_LEVELS[risk_index[i]],
+                'expected_frequency': _FREQUENCY_LEVELS[frequency_index[i]],
+                'capital_efficiency': 'Unknown',
+                'recommendations': [rec for rec, hit in zip(_RECOMMENDATIONS, recommendation_mask[i]) if hit],
+                'risk_reward_ratio': f"1:{rr_ratios[i]:.1f}"
+            }
+            for i in range(len(configs))
+        ]
 
 
 def demonstrate_configuration_tuning():
@@ -369,7 +393,7 @@ def demonstrate_configuration_tuning():
     # Show different configuration profiles
     configs = {
         'Conservative': helper.create_conservative_config(),
-        'Standard': ScalpingConfig(),  # Default config
+        'Standard': DEFAULT_SCALPING_CONFIG,
         'Aggressive': helper.create_aggressive_config()
     }
 
@@ -432,4 +456,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_coroutine(main())
\ No newline at end of file
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional
-from models.trading_models import MarketData
+from models.trading_models import QuoteFrame
 import pandas as pd
 
 
@@ -8,8 +8,8 @@ class IDataProvider(ABC):
     """Interface for market data providers"""
 
     @abstractmethod
-    async def get_quotes(self, symbols: List[str]) -> Dict[str, MarketData]:
-        """Get real-time quotes for symbols"""
+    async def get_quotes(self, symbols: List[str]) -> QuoteFrame:
+        """Get real-time quotes for symbols as a columnar frame keyed by symbol"""
         pass
 
     @abstractmethod
@@ -1,92 +1,203 @@
+import argparse
 import asyncio
 import logging
 import sys
 import os
+import time
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import hashlib
 import getpass
-from typing import Dict, Optional, Tuple
-from dotenv import load_dotenv
+import pickle
+from dataclasses import replace
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Tuple
 
 # Import configurations
-from config.settings import FyersConfig, StrategyConfig, TradingConfig
+from config.settings import (
+    FyersConfig, StrategyConfig, TradingConfig, FYERS_ENV_SCHEMA, STRATEGY_ENV_SCHEMA, load_env_once, parse_env
+)
 from config.breakout_settings import BreakoutConfig, MultiStrategyConfig
+from config.config_store import ConfigStore, env_cached, invalidate_env_configs
 
 # Import utilities
 from utils.auth_helper import FyersAuthHelper
+from utils.event_loop import run_coroutine
+from utils.logging_setup import configure_logging
 
-# Import services
-from services.fyers_service import FyersService
+# Import services (FyersService and the Fyers SDK are imported where used, so auth commands start fast)
 from services.market_timing_service import MarketTimingService
+from services.market_feed_service import FEED_STALE_SECONDS, FyersTickFeed
 
-# Import strategies
-from main_strategy import GapUpShortStrategy
-from strategies.open_breakout_strategy import OpenBreakoutStrategy
+if TYPE_CHECKING:
+    from fyers_apiv3.fyersModel import FyersModel
 
-# Import Fyers API
-from fyers_apiv3 import fyersModel
+logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
+# orjson encodes straight to bytes and parses faster; fall back to the stdlib when it is missing
+try:
+    import orjson
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('trading_strategy.log'),
-        logging.StreamHandler()
-    ]
-)
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _json_loads = json.loads
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+AUTH_REQUEST_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+FYERS_API_BASE_URL = "https://api-t1.fyers.in/api/v3"
+TOKEN_CACHE_PATH = '_token_cache.json'
+TOKEN_VALIDITY_TTL = 3600  # Seconds a successful token check is trusted
+ACCESS_TOKEN_LIFETIME = 82800  # Fyers access tokens last ~24h; trust them locally for 23h
+MIN_CYCLE_SPACING = 5  # Seconds a tick-woken cycle waits after the previous one; each cycle costs several REST calls
+
+_sha256 = hashlib.sha256  # Bound once for the token and app id hashing paths
+
+
+@lru_cache(maxsize=8)
+def _token_digest(access_token: str) -> str:
+    """SHA-256 of an access token, used as the validation cache key"""
+    return _sha256(access_token.encode()).hexdigest()
+
+
+def _prompt(prompt: str, secret: bool = False) -> str:
+    """input()/getpass() that refuses to block a running event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return getpass.getpass(prompt) if secret else input(prompt)
+
+    logger.error("Interactive authentication is required; run `python main_enhanced.py auth` first")
+    return ""
 
 
 class FyersAuthManager:
     """Enhanced Fyers authentication manager with refresh token and PIN support"""
 
     def __init__(self):
-        self.client_id = os.environ.get('FYERS_CLIENT_ID')
-        self.secret_key = os.environ.get('FYERS_SECRET_KEY')
-        self.redirect_uri = os.environ.get('FYERS_REDIRECT_URI', "https://trade.fyers.in/api-login/redirect-to-app")
-        self.refresh_token = os.environ.get('FYERS_REFRESH_TOKEN')
-        self.access_token = os.environ.get('FYERS_ACCESS_TOKEN')
-        self.pin = os.environ.get('FYERS_PIN')  # Load PIN from environment
+        load_env_once()
+        env = dict(os.environ)
+        self.client_id = env.get('FYERS_CLIENT_ID')
+        self.secret_key = env.get('FYERS_SECRET_KEY')
+        self.redirect_uri = env.get('FYERS_REDIRECT_URI', "https://trade.fyers.in/api-login/redirect-to-app")
+        self.refresh_token = env.get('FYERS_REFRESH_TOKEN')
+        self.access_token = env.get('FYERS_ACCESS_TOKEN')
+        self.pin = env.get('FYERS_PIN')  # Load PIN from environment
+        try:
+            self.token_issued_at = int(env.get('FYERS_ACCESS_TOKEN_ISSUED_AT', 0))
+        except ValueError:
+            self.token_issued_at = 0
+
+        # Credentials are fixed for the process, so encode and hash them once
+        self._app_id_bytes = (
+            f"{self.client_id}:{self.secret_key}".encode()
+            if self.client_id and self.secret_key else None
+        )
+        self._app_id_hash = _sha256(self._app_id_bytes).hexdigest() if self._app_id_bytes else None
+
+        # FyersModel instances keyed by access token, reused across validation and session creation
+        self._fyers_by_token: Dict[str, 'FyersModel'] = {}
+
+        # Keep-alive session so repeated token exchanges reuse one connection
+        self._session = requests.Session()
+        # Transient 5xx responses from the token endpoints are retried with exponential backoff
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504],
+                      allowed_methods=["POST"])
+        self._session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry))
+        self._async_session: Optional[aiohttp.ClientSession] = None
+
+    def close(self) -> None:
+        """Release pooled HTTP connections"""
+        self._session.close()
+
+    def _get_async_session(self) -> aiohttp.ClientSession:
+        """Keep-alive aiohttp session for the async auth path, created on first use"""
+        if self._async_session is None or self._async_session.closed:
+            self._async_session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=10),
+                connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60)
+            )
+        return self._async_session
+
+    async def aclose(self) -> None:
+        """Release both the async and the blocking HTTP sessions"""
+        if self._async_session is not None:
+            await self._async_session.close()
+            self._async_session = None
+        self.close()
+
+    def __del__(self):
+        session = getattr(self, '_session', None)
+        if session is not None:
+            session.close()
 
     def save_to_env(self, key: str, value: str) -> None:
         """Save or update environment variable in .env file"""
+        self.save_many_to_env({key: value})
+
+    def save_many_to_env(self, updates: Dict[str, str]) -> None:
+        """Save or update several environment variables with a single .env rewrite"""
         env_file = '.env'
 
+        # Stamp every new access token so later runs can skip validating it
+        if 'FYERS_ACCESS_TOKEN' in updates and 'FYERS_ACCESS_TOKEN_ISSUED_AT' not in updates:
+            self.token_issued_at = int(time.time())
+            updates = {**updates, 'FYERS_ACCESS_TOKEN_ISSUED_AT': str(self.token_issued_at)}
+
         # Read existing .env file
-        env_vars = {}
-        if os.path.exists(env_file):
+        try:
             with open(env_file, 'r') as f:
-                for line in f:
-                    if '=' in line and not line.strip().startswith('#'):
-                        k, v = line.strip().split('=', 1)
-                        env_vars[k] = v
-
-        # Update the specific key
-        env_vars[key] = value
-
-        # Write back to .env file
-        with open(env_file, 'w') as f:
-            for k, v in env_vars.items():
-                f.write(f"{k}={v}\n")
-
-        # Update current environment
-        os.environ[key] = value
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            lines = []
+
+        # Patch existing lines in one pass, keeping comments and ordering
+        pending = dict(updates)
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if not stripped or stripped[0] == '#' or '=' not in stripped:
+                continue
+            key = stripped.partition('=')[0].strip()
+            if key in pending:
+                lines[i] = f"{key}={pending.pop(key)}"
+
+        # Append keys that were not in the file yet
+        lines.extend(f"{key}={value}" for key, value in pending.items())
+
+        # Write to a temp file and swap it in so an interrupted write never truncates .env
+        tmp_file = f"{env_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_file, env_file)
+
+        # Drop the client bound to a replaced access token
+        new_token = updates.get('FYERS_ACCESS_TOKEN')
+        if new_token is not None and new_token != self.access_token:
+            self._fyers_by_token.pop(self.access_token, None)
+
+        # Update current environment and drop configs cached from the old values
+        os.environ.update(updates)
+        invalidate_env_configs()
 
     def get_or_request_pin(self) -> str:
         """Get PIN from environment or request from user"""
         if self.pin:
             return self.pin
 
-        print("\n=== PIN Required for Token Refresh ===")
-        print("Your trading PIN is required for security authentication.")
-        print("This PIN will be saved securely in your .env file for future use.")
+        print("\n".join((
+            "\n=== PIN Required for Token Refresh ===",
+            "Your trading PIN is required for security authentication.",
+            "This PIN will be saved securely in your .env file for future use."
+        )))
 
         # Use getpass for secure PIN input (hides the input)
-        pin = getpass.getpass("Enter your Fyers trading PIN: ").strip()
+        pin = _prompt("Enter your Fyers trading PIN: ", secret=True).strip()
 
         if pin:
             # Save PIN to environment for future use
@@ -97,21 +208,24 @@ class FyersAuthManager:
         else:
             raise ValueError("PIN is required for authentication")
 
-    def generate_access_token_with_refresh(self, refresh_token: str) -> Tuple[Optional[str], Optional[str]]:
+    def generate_access_token_with_refresh(self, refresh_token: str,
+                                           interactive: bool = True) -> Tuple[Optional[str], Optional[str]]:
         """Generate new access token using refresh token with PIN verification"""
         url = "https://api-t1.fyers.in/api/v3/validate-refresh-token"
 
-        # Get PIN (from env or user input)
-        try:
-            pin = self.get_or_request_pin()
-        except ValueError as e:
-            logging.error(f"PIN error: {e}")
+        # Get PIN (from env, or from the user when prompting is allowed)
+        if interactive:
+            try:
+                pin = self.get_or_request_pin()
+            except ValueError as e:
+                logger.error(f"PIN error: {e}")
+                return None, None
+        elif self.pin:
+            pin = self.pin
+        else:
+            logger.error("No saved PIN, cannot refresh the access token unattended")
             return None, None
 
-        headers = {
-            "Content-Type": "application/json"
-        }
-
         data = {
             "grant_type": "refresh_token",
             "appIdHash": self.get_app_id_hash(),
@@ -120,11 +234,11 @@ class FyersAuthManager:
         }
 
         try:
-            response = requests.post(url, headers=headers, data=json.dumps(data))
-            response_data = response.json()
+            response = self._session.post(url, data=_json_dumps(data), headers=JSON_HEADERS, timeout=AUTH_REQUEST_TIMEOUT)
+            response_data = _json_loads(response.content)
 
             if response_data.get('s') == 'ok' and 'access_token' in response_data:
-                logging.info("Successfully refreshed access token with PIN verification")
+                logger.info("Successfully refreshed access token with PIN verification")
                 return response_data['access_token'], response_data.get('refresh_token')
             else:
                 error_msg = response_data.get('message', 'Unknown error')
@@ -132,42 +246,41 @@ class FyersAuthManager:
 
                 # Handle specific PIN-related errors
                 if 'pin' in error_msg.lower() or 'invalid pin' in error_msg.lower():
-                    logging.error(f"PIN verification failed: {error_msg}")
+                    logger.error(f"PIN verification failed: {error_msg}")
                     print("\n⚠️ PIN verification failed. The PIN might be incorrect.")
 
                     # Clear the saved PIN and retry
                     self.pin = None
                     os.environ.pop('FYERS_PIN', None)
 
-                    retry = input("Would you like to retry with a different PIN? (y/n): ").strip().lower()
-                    if retry == 'y':
-                        # Recursive call to retry with new PIN
-                        return self.generate_access_token_with_refresh(refresh_token)
+                    if interactive:
+                        retry = _prompt("Would you like to retry with a different PIN? (y/n): ").strip().lower()
+                        if retry == 'y':
+                            # Recursive call to retry with new PIN
+                            return self.generate_access_token_with_refresh(refresh_token)
                 else:
-                    logging.error(f"Error refreshing token: {error_msg} (Code: {error_code})")
+                    logger.error(f"Error refreshing token: {error_msg} (Code: {error_code})")
 
                 return None, None
 
+        except requests.Timeout as e:
+            logger.error(f"Timed out refreshing token: {e}")
+            return None, None
         except requests.exceptions.RequestException as e:
-            logging.error(f"Network error while refreshing token: {e}")
+            logger.error(f"Network error while refreshing token: {e}")
             return None, None
         except Exception as e:
-            logging.error(f"Unexpected error while refreshing token: {e}")
+            logger.error(f"Unexpected error while refreshing token: {e}")
             return None, None
 
-    def get_app_id_hash(self) -> str:
-        """Generate app_id_hash for API calls"""
-        app_id = f"{self.client_id}:{self.secret_key}"
-        return hashlib.sha256(app_id.encode()).hexdigest()
+    def get_app_id_hash(self) -> Optional[str]:
+        """Return app_id_hash for API calls"""
+        return self._app_id_hash
 
     def get_tokens_from_auth_code(self, auth_code: str) -> Tuple[Optional[str], Optional[str]]:
         """Get both access and refresh tokens from auth code"""
         url = "https://api-t1.fyers.in/api/v3/validate-authcode"
 
-        headers = {
-            "Content-Type": "application/json"
-        }
-
         data = {
             "grant_type": "authorization_code",
             "appIdHash": self.get_app_id_hash(),
@@ -175,66 +288,213 @@ class FyersAuthManager:
         }
 
         try:
-            response = requests.post(url, headers=headers, data=json.dumps(data))
-            response_data = response.json()
+            response = self._session.post(url, data=_json_dumps(data), headers=JSON_HEADERS, timeout=AUTH_REQUEST_TIMEOUT)
+            response_data = _json_loads(response.content)
 
             if response_data.get('s') == 'ok':
                 return (response_data.get('access_token'),
                         response_data.get('refresh_token'))
             else:
-                logging.error(f"Error getting tokens: {response_data.get('message', 'Unknown error')}")
+                logger.error(f"Error getting tokens: {response_data.get('message', 'Unknown error')}")
                 return None, None
 
+        except requests.Timeout as e:
+            logger.error(f"Timed out getting tokens: {e}")
+            return None, None
         except Exception as e:
-            logging.error(f"Exception while getting tokens: {e}")
+            logger.error(f"Exception while getting tokens: {e}")
             return None, None
 
+    @staticmethod
+    def _load_token_cache() -> Dict[str, Dict[str, float]]:
+        """Read the token validation cache, treating a missing or corrupt file as empty"""
+        try:
+            with open(TOKEN_CACHE_PATH, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_token_cache(cache: Dict[str, Dict[str, float]]) -> None:
+        """Write the token validation cache, dropping expired entries"""
+        now = time.time()
+        cache = {k: v for k, v in cache.items() if v.get('valid_until', 0) > now}
+        try:
+            with open(TOKEN_CACHE_PATH, 'w') as f:
+                json.dump(cache, f)
+        except OSError as e:
+            logger.warning(f"Could not write token cache: {e}")
+
+    def _is_token_cached_valid(self, access_token: str) -> bool:
+        """True if a recent check already found this token valid"""
+        cache = self._load_token_cache()
+        return time.time() < cache.get(_token_digest(access_token), {}).get('valid_until', 0)
+
+    def _remember_valid_token(self, access_token: str) -> None:
+        """Record a successful token check in the validation cache"""
+        cache = self._load_token_cache()
+        cache[_token_digest(access_token)] = {'valid_until': time.time() + TOKEN_VALIDITY_TTL}
+        self._save_token_cache(cache)
+
+    def get_fyers_model(self, access_token: str) -> 'FyersModel':
+        """Return the cached FyersModel for a token, creating it on first use"""
+        fyers = self._fyers_by_token.get(access_token)
+        if fyers is None:
+            from fyers_apiv3 import fyersModel
+
+            fyers = fyersModel.FyersModel(client_id=self.client_id, token=access_token)
+            self._fyers_by_token[access_token] = fyers
+        return fyers
+
+    def _is_token_fresh(self) -> bool:
+        """True if the current access token was issued recently enough to use without a network check"""
+        return bool(self.access_token) and self.token_issued_at + ACCESS_TOKEN_LIFETIME > time.time()
+
     def is_token_valid(self, access_token: str) -> bool:
         """Check if access token is still valid"""
         if not access_token:
             return False
 
+        # Trust a recent successful check instead of calling the API again
+        if self._is_token_cached_valid(access_token):
+            return True
+
         # Create a test Fyers model instance
-        fyers = fyersModel.FyersModel(client_id=self.client_id, token=access_token)
+        fyers = self.get_fyers_model(access_token)
 
         try:
             # Make a simple API call to test token validity
             profile = fyers.get_profile()
-            return profile.get('s') == 'ok'
+            valid = profile.get('s') == 'ok'
         except:
             return False
 
+        if valid:
+            self._remember_valid_token(access_token)
+        return valid
+
+    async def _is_token_valid_async(self, session: aiohttp.ClientSession, access_token: str) -> bool:
+        """Check token validity against the profile endpoint without blocking the event loop"""
+        if not access_token:
+            return False
+        if self._is_token_cached_valid(access_token):
+            return True
+
+        try:
+            async with session.get(f"{FYERS_API_BASE_URL}/profile",
+                                   headers={'Authorization': f"{self.client_id}:{access_token}"}) as response:
+                profile = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.warning(f"Token validation request failed: {e}")
+            return False
+
+        valid = profile.get('s') == 'ok'
+        if valid:
+            self._remember_valid_token(access_token)
+        return valid
+
+    async def _refresh_async(self, session: aiohttp.ClientSession,
+                             refresh_token: str) -> Tuple[Optional[str], Optional[str]]:
+        """Exchange the refresh token using the saved PIN, without prompting"""
+        data = {
+            "grant_type": "refresh_token",
+            "appIdHash": self.get_app_id_hash(),
+            "refresh_token": refresh_token,
+            "pin": self.pin
+        }
+
+        try:
+            async with session.post(f"{FYERS_API_BASE_URL}/validate-refresh-token", json=data) as response:
+                response_data = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.warning(f"Speculative token refresh failed: {e}")
+            return None, None
+
+        if response_data.get('s') == 'ok' and 'access_token' in response_data:
+            return response_data['access_token'], response_data.get('refresh_token')
+        return None, None
+
+    async def get_valid_access_token_async(self, optimistic: bool = False) -> Optional[str]:
+        """Async get_valid_access_token: check the current token, then refresh it only if needed"""
+        if self._is_token_fresh() or (self.access_token and self._is_token_cached_valid(self.access_token)):
+            logger.info("Current access token is still valid")
+            return self.access_token
+
+        # Use the token optimistically when a 401 can be recovered by refresh_access_token()
+        if optimistic and self.can_refresh_unattended():
+            logger.info("Using saved access token; it will be refreshed if the API rejects it")
+            return self.access_token
+
+        session = self._get_async_session()
+        if await self._is_token_valid_async(session, self.access_token):
+            logger.info("Current access token is still valid")
+            return self.access_token
+
+        # A refresh can only run unattended when the PIN is already saved
+        if self.refresh_token and self.pin:
+            new_access_token, new_refresh_token = await self._refresh_async(session, self.refresh_token)
+            if new_access_token:
+                logger.info("Successfully refreshed access token")
+                self._save_rotated_tokens(new_access_token, new_refresh_token)
+                return new_access_token
+
+        # Fall back to the interactive flow (PIN prompt / full authentication) off the event loop
+        return await asyncio.to_thread(self.get_valid_access_token)
+
+    def _save_rotated_tokens(self, access_token: str, refresh_token: Optional[str]) -> None:
+        """Persist refreshed tokens, rewriting .env only for values that actually changed"""
+        updates = {
+            key: value
+            for key, value in (('FYERS_ACCESS_TOKEN', access_token), ('FYERS_REFRESH_TOKEN', refresh_token))
+            if value and os.environ.get(key) != value
+        }
+        if updates:
+            self.save_many_to_env(updates)
+
+        self.access_token = access_token
+        if refresh_token:
+            self.refresh_token = refresh_token
+
     def get_valid_access_token(self) -> Optional[str]:
         """Get a valid access token, using refresh token if available"""
 
-        # First, check if current access token is still valid
-        if self.access_token and self.is_token_valid(self.access_token):
-            logging.info("Current access token is still valid")
+        # First, check if current access token is still valid (locally by age, then over the network)
+        if self._is_token_fresh() or (self.access_token and self.is_token_valid(self.access_token)):
+            logger.info("Current access token is still valid")
             return self.access_token
 
         # Try to use refresh token if available
         if self.refresh_token:
-            logging.info("Access token expired, trying to refresh...")
+            logger.info("Access token expired, trying to refresh...")
             new_access_token, new_refresh_token = self.generate_access_token_with_refresh(self.refresh_token)
-
             if new_access_token:
-                logging.info("Successfully refreshed access token")
-
-                # Save new tokens
-                self.save_to_env('FYERS_ACCESS_TOKEN', new_access_token)
-                self.access_token = new_access_token
-
-                if new_refresh_token:
-                    self.save_to_env('FYERS_REFRESH_TOKEN', new_refresh_token)
-                    self.refresh_token = new_refresh_token
-
+                logger.info("Successfully refreshed access token")
+                self._save_rotated_tokens(new_access_token, new_refresh_token)
                 return new_access_token
-            else:
-                logging.warning("Failed to refresh access token, need to re-authenticate")
+            logger.warning("Failed to refresh access token, need to re-authenticate")
 
         # If refresh failed or no refresh token, do full authentication
         return self.setup_full_authentication()
 
+    def refresh_access_token(self) -> Optional[str]:
+        """Exchange the refresh token for a new access token without prompting; used as the API 401 handler"""
+        if not self.refresh_token:
+            return None
+
+        new_access_token, new_refresh_token = self.generate_access_token_with_refresh(
+            self.refresh_token, interactive=False
+        )
+        if not new_access_token:
+            return None
+
+        logger.info("Successfully refreshed access token")
+        self._save_rotated_tokens(new_access_token, new_refresh_token)
+        return new_access_token
+
+    def can_refresh_unattended(self) -> bool:
+        """True if an expired token can be replaced without prompting the user"""
+        return bool(self.access_token and self.refresh_token and self.pin)
+
     def setup_full_authentication(self) -> Optional[str]:
         """Complete authentication flow to get new tokens"""
         print("\n=== Fyers API Full Authentication Setup ===")
@@ -243,23 +503,26 @@ class FyersAuthManager:
             print("Missing CLIENT_ID or SECRET_KEY in environment variables")
             return None
 
-        # Ask for PIN during initial setup if not already saved
+        # Ask for PIN during initial setup if not already saved (written together with the tokens)
+        new_pin = None
         if not self.pin:
-            print("\n📌 Trading PIN Setup")
-            print("Your trading PIN will be needed for future token refreshes.")
-            pin = getpass.getpass("Enter your Fyers trading PIN (will be saved securely): ").strip()
+            print("\n".join((
+                "\n📌 Trading PIN Setup",
+                "Your trading PIN will be needed for future token refreshes."
+            )))
+            pin = _prompt("Enter your Fyers trading PIN (will be saved securely): ", secret=True).strip()
             if pin:
-                self.save_to_env('FYERS_PIN', pin)
-                self.pin = pin
-                print("PIN saved successfully")
+                self.pin = new_pin = pin
 
         # Generate auth URL
         auth_url = FyersAuthHelper.generate_auth_url(self.client_id, self.redirect_uri)
 
-        print(f"\n1. Open this URL: {auth_url}")
-        print("2. Complete authorization and get the code")
+        print("\n".join((
+            f"\n1. Open this URL: {auth_url}",
+            "2. Complete authorization and get the code"
+        )))
 
-        auth_code = input("\nEnter authorization code: ").strip()
+        auth_code = _prompt("\nEnter authorization code: ").strip()
 
         # Get both access and refresh tokens
         access_token, refresh_token = self.get_tokens_from_auth_code(auth_code)
@@ -267,18 +530,28 @@ class FyersAuthManager:
         if access_token:
             print(f"\n=== Saving tokens to .env file ===")
 
-            # Save all tokens to .env
-            self.save_to_env('FYERS_CLIENT_ID', self.client_id)
-            self.save_to_env('FYERS_SECRET_KEY', self.secret_key)
-            self.save_to_env('FYERS_REDIRECT_URI', self.redirect_uri)
-            self.save_to_env('FYERS_ACCESS_TOKEN', access_token)
+            # Save all tokens to .env in one write
+            updates = {
+                'FYERS_CLIENT_ID': self.client_id,
+                'FYERS_SECRET_KEY': self.secret_key,
+                'FYERS_REDIRECT_URI': self.redirect_uri,
+                'FYERS_ACCESS_TOKEN': access_token,
+            }
+            if refresh_token:
+                updates['FYERS_REFRESH_TOKEN'] = refresh_token
+            if new_pin:
+                updates['FYERS_PIN'] = new_pin
+            self.save_many_to_env(updates)
 
             if refresh_token:
-                self.save_to_env('FYERS_REFRESH_TOKEN', refresh_token)
                 print(f"FYERS_REFRESH_TOKEN saved")
+            if new_pin:
+                print("PIN saved successfully")
 
-            print(f"\nAuthentication successful!")
-            print(f"Access Token: {access_token[:20]}...")
+            print("\n".join((
+                f"\nAuthentication successful!",
+                f"Access Token: {access_token[:20]}..."
+            )))
             if refresh_token:
                 print(f"Refresh Token: {refresh_token[:20]}...")
 
@@ -289,11 +562,13 @@ class FyersAuthManager:
 
     def update_pin(self) -> bool:
         """Update or change the saved PIN"""
-        print("\n=== Update Trading PIN ===")
-        print("This will update your saved trading PIN.")
+        print("\n".join((
+            "\n=== Update Trading PIN ===",
+            "This will update your saved trading PIN."
+        )))
 
-        new_pin = getpass.getpass("Enter new PIN: ").strip()
-        confirm_pin = getpass.getpass("Confirm new PIN: ").strip()
+        new_pin = _prompt("Enter new PIN: ", secret=True).strip()
+        confirm_pin = _prompt("Confirm new PIN: ", secret=True).strip()
 
         if new_pin != confirm_pin:
             print("❌ PINs do not match!")
@@ -313,6 +588,8 @@ class EnhancedMultiStrategyManager:
     """Enhanced strategy manager supporting multiple strategies"""
 
     def __init__(self, fyers_config, strategy_config, trading_config, breakout_config):
+        from services.fyers_service import FyersService
+
         # Initialize services
         self.fyers_service = FyersService(fyers_config)
         self.timing_service = MarketTimingService(trading_config)
@@ -322,8 +599,13 @@ class EnhancedMultiStrategyManager:
         self.trading_config = trading_config
         self.breakout_config = breakout_config
 
-        # Strategy instances
-        self.gap_up_strategy = GapUpShortStrategy(fyers_config, strategy_config, trading_config)
+        # Strategy instances (imported here so auth-only runs skip the strategy stack)
+        from main_strategy import GapUpShortStrategy
+        from strategies.open_breakout_strategy import OpenBreakoutStrategy
+
+        self.gap_up_strategy = GapUpShortStrategy(
+            fyers_config, strategy_config, trading_config, self.fyers_service
+        )
         self.breakout_strategy = OpenBreakoutStrategy(
             self.fyers_service, strategy_config, trading_config, breakout_config
         )
@@ -331,112 +613,279 @@ class EnhancedMultiStrategyManager:
         # Performance tracking
         self.total_portfolio_pnl = 0.0
         self.daily_portfolio_pnl = 0.0
+        self._perf_getters = {
+            'gap_up': self.gap_up_strategy.get_performance_summary_light,  # Polled every cycle
+            'breakout': self.breakout_strategy.get_breakout_performance
+        }
+        self._strategy_perf: Dict[str, Dict] = {}
+        self._cycles = (
+            ('gap_up', self.gap_up_strategy.run_strategy_cycle),
+            ('breakout', self.breakout_strategy.run_breakout_cycle)
+        )
+
+        # Market-hours gating, set/cleared by the watcher task
+        self._market_open = asyncio.Event()
+        self._market_watcher: Optional[asyncio.Task] = None
+
+        # WebSocket ticks drive the cycles; polling on the interval is the fallback
+        self.tick_feed = FyersTickFeed(fyers_config, self.fyers_service.symbol_mapping.values())
+        self._feed_heartbeat: Optional[asyncio.Task] = None
 
     async def initialize(self) -> bool:
         """Initialize all strategies"""
         try:
-            # Verify connections
-            if not await self.gap_up_strategy.initialize():
-                logging.error("Failed to initialize gap-up strategy")
+            # Verify connections for every strategy that supports it, concurrently
+            strategies = [
+                (name, strategy) for name, strategy in
+                (('gap-up', self.gap_up_strategy), ('breakout', self.breakout_strategy))
+                if hasattr(strategy, 'initialize')
+            ]
+            results = await asyncio.gather(
+                *(strategy.initialize() for _, strategy in strategies),
+                return_exceptions=True
+            )
+
+            failed = [name for (name, _), result in zip(strategies, results) if result is not True]
+            if failed:
+                logger.error(f"Failed to initialize strategies: {', '.join(failed)}")
                 return False
 
-            logging.info("Multi-strategy manager initialized successfully")
+            if await self.tick_feed.start():
+                self._feed_heartbeat = asyncio.create_task(self._watch_feed_health())
+            else:
+                logger.warning("Market feed unavailable, falling back to interval polling")
+
+            logger.info("Multi-strategy manager initialized successfully")
             return True
 
         except Exception as e:
-            logging.error(f"Multi-strategy initialization failed: {e}")
+            logger.error(f"Multi-strategy initialization failed: {e}")
             return False
 
     async def run_all_strategies(self) -> None:
         """Run all strategies in parallel"""
         try:
-            # Check trading hours
-            if not self.timing_service.is_trading_time():
-                logging.info("Outside trading hours, sleeping...")
-                await asyncio.sleep(300)
-                return
-
-            # Run strategies concurrently
-            await asyncio.gather(
-                self.gap_up_strategy.run_strategy_cycle(),
-                self.breakout_strategy.run_breakout_cycle(),
-                return_exceptions=True
-            )
+            # Wait for trading hours without polling
+            await self._wait_for_market_open()
 
-            # Update portfolio performance
-            self._update_portfolio_performance()
+            # Run strategies concurrently, folding each one's PnL in as soon as it finishes
+            async with asyncio.TaskGroup() as tg:
+                for name, cycle in self._cycles:
+                    tg.create_task(self._run_guarded_cycle(name, cycle()), name=f"{name}-cycle")
 
-            # Log combined performance
-            self._log_portfolio_status()
+            # Log combined performance from the folded snapshots
+            self._log_portfolio_status(self._strategy_perf['gap_up'], self._strategy_perf['breakout'])
+
+        except Exception as e:
+            logger.error(f"Error running multi-strategy: {e}")
+
+    async def _watch_market_hours(self) -> None:
+        """Keep the market-open event in step with trading hours"""
+        while True:
+            seconds_to_open = self.timing_service.seconds_until_market_open()
+            if seconds_to_open > 0:
+                self._market_open.clear()
+                await asyncio.sleep(seconds_to_open)
+                continue
+
+            self._market_open.set()
+            await asyncio.sleep(self.timing_service.seconds_until_market_close() + 1)
+
+    async def _wait_for_market_open(self) -> bool:
+        """Block until trading hours, returning True if the market was closed"""
+        if self._market_watcher is None:
+            self._market_watcher = asyncio.create_task(self._watch_market_hours())
+        if self._market_open.is_set():
+            return False
+
+        logger.info("Outside trading hours, waiting for market open...")
+        await self._market_open.wait()
+        return True
 
+    async def _run_guarded_cycle(self, name: str, cycle) -> None:
+        """Run one strategy cycle, logging its failure instead of cancelling its siblings"""
+        try:
+            await cycle
         except Exception as e:
-            logging.error(f"Error running multi-strategy: {e}")
+            logger.error(f"Strategy cycle failed ({name}): {e!r}")
+        finally:
+            self._fold_incremental_perf(name)
 
-    def _update_portfolio_performance(self) -> None:
-        """Update overall portfolio performance"""
-        gap_up_perf = self.gap_up_strategy.get_performance_summary()
-        breakout_perf = self.breakout_strategy.get_breakout_performance()
+    def _fold_incremental_perf(self, strategy_name: str) -> None:
+        """Refresh one strategy's performance snapshot and update portfolio totals"""
+        self._strategy_perf[strategy_name] = self._perf_getters[strategy_name]()
 
-        self.total_portfolio_pnl = gap_up_perf['total_pnl'] + breakout_perf['total_pnl']
-        self.daily_portfolio_pnl = gap_up_perf['daily_pnl'] + breakout_perf['daily_pnl']
+        self.total_portfolio_pnl = sum(perf['total_pnl'] for perf in self._strategy_perf.values())
+        self.daily_portfolio_pnl = sum(perf['daily_pnl'] for perf in self._strategy_perf.values())
 
-    def _log_portfolio_status(self) -> None:
+    def _log_portfolio_status(self, gap_up_perf: Dict, breakout_perf: Dict) -> None:
         """Log overall portfolio status"""
-        gap_up_perf = self.gap_up_strategy.get_performance_summary()
-        breakout_perf = self.breakout_strategy.get_breakout_performance()
+        if not logger.isEnabledFor(logging.INFO):
+            return
 
         total_positions = gap_up_perf['active_positions'] + breakout_perf['active_positions']
 
-        logging.info(f"=== PORTFOLIO STATUS ===")
-        logging.info(f"Total Positions: {total_positions}")
-        logging.info(f"Gap-Up Short: {gap_up_perf['active_positions']} positions, "
-                     f"PnL: Rs.{gap_up_perf['daily_pnl']:.2f}")
-        logging.info(f"Breakout: {breakout_perf['active_positions']} positions, "
-                     f"PnL: Rs.{breakout_perf['daily_pnl']:.2f}")
-        logging.info(f"Portfolio Daily PnL: Rs.{self.daily_portfolio_pnl:.2f}")
-        logging.info(f"Portfolio Total PnL: Rs.{self.total_portfolio_pnl:.2f}")
+        # Emit one multi-line record instead of one record per line
+        logger.info("\n".join((
+            "=== PORTFOLIO STATUS ===",
+            f"Total Positions: {total_positions}",
+            f"Gap-Up Short: {gap_up_perf['active_positions']} positions, PnL: Rs.{gap_up_perf['daily_pnl']:.2f}",
+            f"Breakout: {breakout_perf['active_positions']} positions, PnL: Rs.{breakout_perf['daily_pnl']:.2f}",
+            f"Portfolio Daily PnL: Rs.{self.daily_portfolio_pnl:.2f}",
+            f"Portfolio Total PnL: Rs.{self.total_portfolio_pnl:.2f}"
+        )))
 
     async def run(self) -> None:
         """Main multi-strategy execution loop"""
-        logging.info("Starting Enhanced Multi-Strategy Trading System")
+        logger.info("Starting Enhanced Multi-Strategy Trading System")
 
         if not await self.initialize():
-            logging.error("Multi-strategy initialization failed")
+            logger.error("Multi-strategy initialization failed")
             return
 
+        loop = asyncio.get_running_loop()
+        interval = self.trading_config.monitoring_interval
+        next_tick = loop.time()
+
         try:
             while True:
+                if await self._wait_for_market_open():
+                    # Hours spent closed are not an overrun; schedule from the open
+                    next_tick = loop.time()
+
+                cycle_started = loop.time()
                 await self.run_all_strategies()
 
-                # Sleep until next cycle
-                await asyncio.sleep(self.trading_config.monitoring_interval)
+                # Wait until the next deadline so cycle runtime does not accumulate as drift;
+                # a cycle woken early by a market tick keeps the current deadline
+                now = loop.time()
+                if now >= next_tick:
+                    next_tick += interval
+                    if next_tick < now:
+                        # Skip missed deadlines rather than running catch-up cycles against the API
+                        logger.warning(f"Strategy cycle overran the {interval}s interval by {now - next_tick:.1f}s")
+                        next_tick = now
+                remaining = next_tick - now
+
+                # Wake early for a market timing boundary or, when the feed is up, the next tick
+                timeout = min(remaining, self.timing_service.seconds_until_next_event())
+
+                # Ticks only cut the wait short once MIN_CYCLE_SPACING has passed, keeping REST
+                # polling within the broker's rate limits while the feed is busy
+                spacing = cycle_started + MIN_CYCLE_SPACING - now
+                if self.tick_feed.connected and spacing < timeout:
+                    if spacing > 0:
+                        await asyncio.sleep(spacing)
+                    await self._wait_for_tick(timeout - max(spacing, 0))
+                else:
+                    await asyncio.sleep(timeout)
 
         except KeyboardInterrupt:
-            logging.info("Multi-strategy system stopped by user")
+            logger.info("Multi-strategy system stopped by user")
         except Exception as e:
-            logging.error(f"Fatal error in multi-strategy: {e}")
+            logger.error(f"Fatal error in multi-strategy: {e}")
+        finally:
+            await self.aclose()
 
+    async def _wait_for_tick(self, timeout: float) -> None:
+        """Wait for a market tick, then drop the backlog so one cycle covers the whole burst"""
+        try:
+            await asyncio.wait_for(self.tick_feed.get(), timeout)
+        except asyncio.TimeoutError:
+            return
+        self.tick_feed.drain()
 
-def load_config() -> Dict:
-    """Load configuration from environment or config file"""
-    return {
-        'fyers': FyersConfig(
-            client_id=os.environ.get('FYERS_CLIENT_ID'),
-            secret_key=os.environ.get('FYERS_SECRET_KEY'),
-            redirect_uri=os.environ.get('FYERS_REDIRECT_URI', 'https://trade.fyers.in/api-login/redirect-to-app'),
-            access_token=os.environ.get('FYERS_ACCESS_TOKEN')
-        ),
-        'strategy': StrategyConfig(
-            portfolio_value=float(os.environ.get('PORTFOLIO_VALUE', 1000000)),
-            risk_per_trade_pct=float(os.environ.get('RISK_PER_TRADE', 1.0)),
-            max_positions=int(os.environ.get('MAX_POSITIONS', 3)),
-            min_gap_percentage=float(os.environ.get('MIN_GAP_PERCENTAGE', 0.5)),
-            min_selling_pressure=float(os.environ.get('MIN_SELLING_PRESSURE', 40.0)),
-            min_volume_ratio=float(os.environ.get('MIN_VOLUME_RATIO', 1.2)),
-            min_confidence=float(os.environ.get('MIN_CONFIDENCE', 0.6)),
-            stop_loss_pct=float(os.environ.get('STOP_LOSS_PCT', 1.5)),
-            target_pct=float(os.environ.get('TARGET_PCT', 3.0))
-        ),
+    async def _watch_feed_health(self) -> None:
+        """Reconnect the market feed when it goes quiet during trading hours"""
+        while True:
+            await asyncio.sleep(FEED_STALE_SECONDS)
+            if not self._market_open.is_set():
+                continue
+
+            age = self.tick_feed.seconds_since_last_tick()
+            if age is not None and age < FEED_STALE_SECONDS:
+                continue
+
+            logger.warning("No market ticks received recently, reconnecting feed")
+            await asyncio.to_thread(self.tick_feed.stop)
+            if not await self.tick_feed.start(self.fyers_service.config):
+                logger.error("Market feed reconnect failed, polling until the next check")
+
+    async def aclose(self) -> None:
+        """Stop background tasks and release shared connections"""
+        for task in (self._market_watcher, self._feed_heartbeat):
+            if task is not None:
+                task.cancel()
+        self._market_watcher = None
+        self._feed_heartbeat = None
+        await asyncio.to_thread(self.tick_feed.stop)
+        await asyncio.to_thread(self.fyers_service.close)
+
+
+COMPILED_CONFIG_PATH = 'config.pkl'
+_config_store = ConfigStore()
+
+# Environment variables the compiled (credential-free) config is built from
+COMPILED_CONFIG_ENV_KEYS = tuple(name for name, _, _, _ in STRATEGY_ENV_SCHEMA)
+
+
+def _compiled_config_env() -> Dict[str, Optional[str]]:
+    return {key: os.environ.get(key) for key in COMPILED_CONFIG_ENV_KEYS}
+
+
+def _read_compiled_config(path) -> Dict:
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def _load_compiled_config() -> Optional[Mapping[str, Any]]:
+    """Return config.pkl's configs if they were compiled from the current settings, else None"""
+    try:
+        compiled = _config_store.load(COMPILED_CONFIG_PATH, _read_compiled_config)
+    except FileNotFoundError:
+        return None
+
+    if compiled['env'] != _compiled_config_env():
+        return None
+
+    # Credentials are never pickled, so token refreshes do not invalidate the compiled config
+    return MappingProxyType({**compiled['config'], 'fyers': _fyers_config_from_env(os.environ)})
+
+
+def load_config() -> Mapping[str, Any]:
+    """Load read-only configuration from environment or config file (parsed once until a token refresh invalidates it)"""
+    load_env_once()
+    compiled = _load_compiled_config()
+    if compiled is not None:
+        return compiled
+    return _load_env_config()
+
+
+def compile_config() -> None:
+    """Resolve the non-credential config once and pickle it for faster startup"""
+    load_env_once()
+    config = _load_env_config()
+    compiled = {
+        'env': _compiled_config_env(),
+        'config': {name: value for name, value in config.items() if name != 'fyers'}
+    }
+    with open(COMPILED_CONFIG_PATH, 'wb') as f:
+        pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"Compiled configuration written to {COMPILED_CONFIG_PATH}")
+
+
+def _fyers_config_from_env(env: Mapping[str, str]) -> FyersConfig:
+    """Build the Fyers credentials config from the environment"""
+    return FyersConfig(**parse_env(FYERS_ENV_SCHEMA, env))
+
+
+@env_cached
+def _load_env_config() -> Mapping[str, Any]:
+    """Build the config dicts from the environment"""
+    env = dict(os.environ)  # One snapshot instead of repeated os.environ proxy lookups
+    return MappingProxyType({
+        'fyers': _fyers_config_from_env(env),
+        'strategy': StrategyConfig(**parse_env(STRATEGY_ENV_SCHEMA, env)),
         'trading': TradingConfig(
             market_start_hour=9,
             market_start_minute=15,
@@ -463,79 +912,96 @@ def load_config() -> Dict:
             portfolio_stop_loss=5.0,
             daily_profit_target=3.0
         )
-    }
+    })
 
 
-def authenticate_fyers(config: Dict) -> bool:
-    """Handle Fyers authentication with refresh token and PIN support"""
-    auth_manager = FyersAuthManager()
+async def authenticate_fyers(config: Mapping[str, Any],
+                             auth_manager: Optional[FyersAuthManager] = None,
+                             optimistic: bool = False) -> Optional[FyersConfig]:
+    """Handle Fyers authentication with refresh token and PIN support, returning the authenticated config"""
+    if auth_manager is None:
+        auth_manager = FyersAuthManager()
+        try:
+            return await authenticate_fyers(config, auth_manager, optimistic)
+        finally:
+            await auth_manager.aclose()
 
-    # Get valid access token (will auto-refresh if needed)
-    access_token = auth_manager.get_valid_access_token()
+    # Get valid access token (will auto-refresh if needed) without blocking the event loop
+    access_token = await auth_manager.get_valid_access_token_async(optimistic=optimistic)
 
     if access_token:
-        # Update config with the valid token
-        config['fyers'].access_token = access_token
-        logging.info("Fyers authentication successful")
-        return True
+        logger.info("Fyers authentication successful")
+        return replace(config['fyers'], access_token=access_token)
     else:
-        logging.error("Fyers authentication failed")
-        return False
+        logger.error("Fyers authentication failed")
+        return None
 
 
 async def main_multi_strategy():
     """Main entry point for multi-strategy system"""
+    # One auth manager (and its HTTP sessions) for the whole run
+    auth_manager = FyersAuthManager()
     try:
         # Load configuration
         config = load_config()
 
         # Handle authentication with refresh token support
-        if not authenticate_fyers(config):
+        fyers_config = await authenticate_fyers(config, auth_manager, optimistic=True)
+        if not fyers_config:
             print("Authentication failed. Exiting...")
             return
 
         # Initialize multi-strategy manager
         multi_strategy = EnhancedMultiStrategyManager(
-            config['fyers'],
+            fyers_config,
             config['strategy'],
             config['trading'],
             config['breakout']
         )
+        multi_strategy.fyers_service.token_refresher = auth_manager.refresh_access_token
 
         await multi_strategy.run()
 
     except Exception as e:
-        logging.error(f"Fatal error in multi-strategy: {e}")
+        logger.error(f"Fatal error in multi-strategy: {e}")
+    finally:
+        await auth_manager.aclose()
 
 
 async def main_single_strategy():
     """Main entry point for single gap-up strategy"""
+    auth_manager = FyersAuthManager()
     try:
         # Load configuration
         config = load_config()
 
         # Handle authentication with refresh token support
-        if not authenticate_fyers(config):
+        fyers_config = await authenticate_fyers(config, auth_manager, optimistic=True)
+        if not fyers_config:
             print("Authentication failed. Exiting...")
             return
 
         # Initialize and run single strategy
         from main_strategy import GapUpShortStrategy
         strategy = GapUpShortStrategy(
-            config['fyers'],
+            fyers_config,
             config['strategy'],
             config['trading']
         )
+        strategy.fyers_service.token_refresher = auth_manager.refresh_access_token
 
         await strategy.run()
 
     except Exception as e:
-        logging.error(f"Fatal error: {e}")
+        logger.error(f"Fatal error: {e}")
+    finally:
+        await auth_manager.aclose()
 
 
 def setup_auth_only():
     """Enhanced authentication setup with refresh token and PIN support"""
     print("=== Enhanced Fyers API Authentication Setup with PIN ===")
+    load_env_once()
 
     # Check if we already have credentials in environment
     if os.environ.get('FYERS_CLIENT_ID') and os.environ.get('FYERS_SECRET_KEY'):
@@ -566,8 +1032,10 @@ def setup_auth_only():
     access_token = auth_manager.setup_full_authentication()
 
     if access_token:
-        print("\nEnhanced authentication setup completed!")
-        print("Refresh token and PIN have been saved for automatic token renewal.")
+        print("\n".join((
+            "\nEnhanced authentication setup completed!",
+            "Refresh token and PIN have been saved for automatic token renewal."
+        )))
     else:
         print("Authentication setup failed!")
 
@@ -578,83 +1046,106 @@ def create_fyers_session():
     access_token = auth_manager.get_valid_access_token()
 
     if access_token:
-        client_id = os.environ.get('FYERS_CLIENT_ID')
-        fyers = fyersModel.FyersModel(client_id=client_id, token=access_token)
-        return fyers
+        # Reuses the client already built while validating the token
+        return auth_manager.get_fyers_model(access_token)
     else:
-        logging.error("Failed to create Fyers session")
+        logger.error("Failed to create Fyers session")
         return None
 
 
+def run_multi():
+    """Run the multi-strategy system"""
+    print("Starting Enhanced Multi-Strategy Trading System...")
+    run_coroutine(main_multi_strategy())
+
+
+def run_single():
+    """Run the gap-up short strategy only"""
+    print("Starting Gap-Up Short Strategy...")
+    run_coroutine(main_single_strategy())
+
+
+def update_pin_only():
+    """Update the saved trading PIN"""
+    auth_manager = FyersAuthManager()
+    auth_manager.update_pin()
+
+
+def test_auth_only():
+    """Test authentication without running strategies"""
+    config = load_config()
+    if run_coroutine(authenticate_fyers(config)):
+        print("Authentication test successful!")
+        # Test API call
+        fyers = create_fyers_session()
+        if fyers:
+            profile = fyers.get_profile()
+            print(f"Profile: {profile}")
+    else:
+        print("Authentication test failed!")
+
+
+COMMANDS = {
+    'multi': (run_multi, "Run multi-strategy system"),
+    'single': (run_single, "Run gap-up short strategy only"),
+    'auth': (setup_auth_only, "Setup Fyers authentication"),
+    'update-pin': (update_pin_only, "Update trading PIN"),
+    'test-auth': (test_auth_only, "Test authentication"),
+    'compile-config': (compile_config, "Pickle resolved config to config.pkl"),
+}
+
+MENU_CHOICES = {'1': 'multi', '2': 'single', '3': 'auth', '4': 'update-pin', '5': 'test-auth'}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser"""
+    parser = argparse.ArgumentParser(
+        description="Enhanced Multi-Strategy Trading System",
+        epilog="commands:\n" + "\n".join(f"  {name:<16}{help_text}" for name, (_, help_text) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    # Commands are case-insensitive, so "AUTH" and "auth" both work
+    parser.add_argument('command', nargs='?', type=str.lower, choices=COMMANDS, metavar='command',
+                        help="command to run (see below); omit for the interactive menu")
+    return parser
+
+
+def interactive_menu():
+    """Prompt for a trading mode and run it"""
+    print("\n".join((
+        "🔧 Select trading mode:",
+        "1. Multi-Strategy System (Gap-Up Short + Breakout)",
+        "2. Single Strategy (Gap-Up Short only)",
+        "3. Setup Authentication",
+        "4. Update Trading PIN",
+        "5. Test Authentication"
+    )))
+
+    choice = input("\nEnter choice (1/2/3/4/5): ").strip()
+
+    command = MENU_CHOICES.get(choice)
+    if command:
+        COMMANDS[command][0]()
+    else:
+        print("Invalid choice")
+
+
 def main():
     """Main entry point with command options"""
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
-
-        if command == "multi":
-            print("Starting Enhanced Multi-Strategy Trading System...")
-            asyncio.run(main_multi_strategy())
-        elif command == "single":
-            print("Starting Gap-Up Short Strategy...")
-            asyncio.run(main_single_strategy())
-        elif command == "auth":
-            setup_auth_only()
-        elif command == "update-pin":
-            # New command to update PIN
-            auth_manager = FyersAuthManager()
-            auth_manager.update_pin()
-        elif command == "test-auth":
-            # Test authentication without running strategies
-            config = load_config()
-            if authenticate_fyers(config):
-                print("Authentication test successful!")
-                # Test API call
-                fyers = create_fyers_session()
-                if fyers:
-                    profile = fyers.get_profile()
-                    print(f"Profile: {profile}")
-            else:
-                print("Authentication test failed!")
-        else:
-            print("  Unknown command. Available options:")
-            print("  python main_enhanced.py multi       - Run multi-strategy system")
-            print("  python main_enhanced.py single      - Run gap-up short strategy only")
-            print("  python main_enhanced.py auth        - Setup Fyers authentication")
-            print("  python main_enhanced.py update-pin  - Update trading PIN")
-            print("  python main_enhanced.py test-auth   - Test authentication")
+    # Records are written by a background listener thread
+    configure_logging('trading_strategy.log')
+
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if args.command:
+        COMMANDS[args.command][0]()
+    elif sys.stdin.isatty():
+        interactive_menu()
     else:
-        print("🔧 Select trading mode:")
-        print("1. Multi-Strategy System (Gap-Up Short + Breakout)")
-        print("2. Single Strategy (Gap-Up Short only)")
-        print("3. Setup Authentication")
-        print("4. Update Trading PIN")
-        print("5. Test Authentication")
-
-        choice = input("\nEnter choice (1/2/3/4/5): ").strip()
-
-        if choice == "1":
-            print("Starting Enhanced Multi-Strategy Trading System...")
-            asyncio.run(main_multi_strategy())
-        elif choice == "2":
-            print("Starting Gap-Up Short Strategy...")
-            asyncio.run(main_single_strategy())
-        elif choice == "3":
-            setup_auth_only()
-        elif choice == "4":
-            auth_manager = FyersAuthManager()
-            auth_manager.update_pin()
-        elif choice == "5":
-            config = load_config()
-            if authenticate_fyers(config):
-                print("Authentication test successful!")
-                fyers = create_fyers_session()
-                if fyers:
-                    profile = fyers.get_profile()
-                    print(f"Profile: {profile}")
-            else:
-                print("Authentication test failed!")
-        else:
-            print("Invalid choice")
+        # Never block on input() when started by a supervisor without a terminal
+        parser.print_help()
+        sys.exit(2)
 
 
 if __name__ == "__main__":
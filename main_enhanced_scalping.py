@@ -4,35 +4,44 @@ import asyncio
 import logging
 import sys
 import os
-from typing import Dict
-from dotenv import load_dotenv
+import time
+from dataclasses import replace
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 # Import configurations
-from config.settings import FyersConfig, StrategyConfig, TradingConfig
+from config.settings import (
+    FyersConfig, StrategyConfig, TradingConfig, FYERS_ENV_SCHEMA, STRATEGY_ENV_SCHEMA, load_env_once, parse_env
+)
 from config.breakout_settings import BreakoutConfig
-from config.scalping_settings import ScalpingConfig, MultiStrategyScalpingConfig
+from config.scalping_settings import (
+    ScalpingConfig, MultiStrategyScalpingConfig, SCALPING_ENV_SCHEMA, MULTI_SCALPING_ENV_SCHEMA
+)
+from config.config_store import env_cached
 
 # Import services
+from models.trading_models import (
+    ComprehensivePerformance, PortfolioSummary, RiskMetrics, ScalpingMetrics, StrategyPerf
+)
 from services.enhanced_fyers_service import EnhancedFyersService
 from services.market_timing_service import MarketTimingService
+from services.market_feed_service import FEED_STALE_SECONDS
+
+# Import utilities
+from utils.event_loop import run_coroutine
+from utils.logging_setup import configure_logging
 
 # Import strategies
 from main_strategy import GapUpShortStrategy
 from strategies.open_breakout_strategy import OpenBreakoutStrategy
 from strategies.level2_scalping_strategy import Level2ScalpingStrategy
 
-# Load environment variables
-load_dotenv()
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('trading_strategy_with_scalping.log'),
-        logging.StreamHandler()
-    ]
-)
+SCALPING_CYCLE_INTERVAL = 2  # Seconds between scalping cycles; the other strategies use monitoring_interval
+MIN_WAKE_SPACING = 1.5  # Seconds from a cycle's start before a feed push may start the next one (REST rate limits)
+STATUS_LOG_INTERVAL = 30  # Seconds between portfolio status dumps while nothing material changes
+STATUS_LOG_PNL_DELTA = 100.0  # Daily PnL move (Rs.) that forces an early status dump
+
+logger = logging.getLogger(__name__)
 
 
 class EnhancedMultiStrategyWithScalping:
@@ -53,7 +62,9 @@ class EnhancedMultiStrategyWithScalping:
         self.multi_config = multi_config
 
         # Strategy instances
-        self.gap_up_strategy = GapUpShortStrategy(fyers_config, strategy_config, trading_config)
+        self.gap_up_strategy = GapUpShortStrategy(
+            fyers_config, strategy_config, trading_config, self.fyers_service
+        )
         self.breakout_strategy = OpenBreakoutStrategy(
             self.fyers_service, strategy_config, trading_config, breakout_config
         )
@@ -66,83 +77,171 @@ class EnhancedMultiStrategyWithScalping:
         self.daily_portfolio_pnl = 0.0
 
         # Strategy coordination
-        self.last_non_scalping_trade_time = None
-        self.strategy_activity_log = []
+        self.last_non_scalping_trade_time: Optional[float] = None  # time.monotonic() of the last new position
+        self._cooldown_seconds = multi_config.cross_strategy_cooldown_minutes * 60
+        self._last_activity_count = 0  # Non-scalping positions seen at the last coordination check
+        self._scalping_allowed = asyncio.Event()  # Set by the oversight task while scalping may trade
+        self._tasks: List[asyncio.Task] = []
+
+        # Depth/trade pushes keep the service's order books current and wake the scalping loop early;
+        # the cycle interval remains the fallback
+        self.tick_feed = self.fyers_service.create_depth_feed(
+            self.scalping_strategy.signal_service.scalping_universe
+        )
+        self._tick_event = self.tick_feed.tick_event
+
+        # Headline figures per strategy, allocated once and refreshed in place each cycle
+        self._cycle_perf: Tuple[StrategyPerf, StrategyPerf, StrategyPerf] = (
+            StrategyPerf(), StrategyPerf(), StrategyPerf()
+        )
+
+        # Portfolio status log rate limiting
+        self._last_log_ts = 0.0  # time.monotonic() of the last status dump
+        self._last_logged_pnl: Optional[float] = None
+        self._last_logged_positions: Optional[int] = None
+
+        # Full per-strategy reports for get_comprehensive_performance, reused until the strategies run again
+        self._last_perf_snapshot: Optional[Tuple[Dict, Dict, Dict]] = None
+        self._perf_dirty = True
 
     async def initialize(self) -> bool:
         """Initialize all strategies including scalping"""
         try:
             # Verify connections
             if not await self.gap_up_strategy.initialize():
-                logging.error("Failed to initialize gap-up strategy")
+                logger.error("Failed to initialize gap-up strategy")
                 return False
 
-            # Test Level II data connectivity
+            # Test Level II data connectivity; one symbol answering is enough
             test_symbols = ['RELIANCE.NS', 'TCS.NS']
-            for symbol in test_symbols:
-                order_book = await self.fyers_service.get_market_depth(symbol)
-                if order_book:
-                    logging.info(f"Level II data available for {symbol}")
-                    break
-            else:
-                logging.warning("Level II data may not be available")
+            if not await self._probe_level2(test_symbols):
+                logger.warning("Level II data may not be available")
 
-            logging.info("Multi-strategy with scalping initialized successfully")
+            # The feed watchdog in run() retries a failed start; until then books are polled over REST
+            if not await self.tick_feed.start():
+                logger.warning("Market feed unavailable, scalping falls back to interval polling")
+
+            logger.info("Multi-strategy with scalping initialized successfully")
             return True
 
         except Exception as e:
-            logging.error(f"Multi-strategy initialization failed: {e}")
+            logger.error(f"Multi-strategy initialization failed: {e}")
             return False
 
-    async def run_all_strategies_with_scalping(self) -> None:
-        """Run all strategies including scalping with coordination"""
+    async def _probe_level2(self, symbols) -> bool:
+        """Return as soon as any symbol returns an order book, cancelling the remaining probes"""
+        pending = {asyncio.create_task(self.fyers_service.get_market_depth(s)): s for s in symbols}
         try:
-            # Check trading hours
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    symbol = pending.pop(task)
+                    if not task.cancelled() and task.exception() is None and task.result():
+                        logger.info(f"Level II data available for {symbol}")
+                        return True
+            return False
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _update_after_cycle(self, position_counts: Optional[Tuple[int, int]] = None) -> None:
+        """Fold strategy performance into the portfolio and update coordination tracking"""
+        # Collect each strategy's performance once for this cycle
+        snap = await self._collect_perf()
+
+        # Update portfolio performance
+        self._update_portfolio_performance(*snap)
+
+        # Log combined performance
+        self._log_portfolio_status(*snap)
+
+        # Update strategy coordination tracking
+        self._update_strategy_coordination(position_counts or self._position_counts())
+
+    async def _watch_feed_health(self) -> None:
+        """Reconnect the depth feed when it goes quiet during trading hours"""
+        while True:
+            await asyncio.sleep(FEED_STALE_SECONDS)
+            if not self.timing_service.is_trading_time():
+                continue
+
+            age = self.tick_feed.seconds_since_last_tick()
+            if age is not None and age < FEED_STALE_SECONDS:
+                continue
+
+            logger.warning("No depth feed messages received recently, reconnecting feed")
+            await asyncio.to_thread(self.tick_feed.stop)
+            if not await self.tick_feed.start(self.fyers_service.config):
+                logger.error("Depth feed reconnect failed, polling until the next check")
+
+    async def _run_forever(self, name: str, cycle, interval: float,
+                           gate: Optional[asyncio.Event] = None,
+                           wake: Optional[asyncio.Event] = None) -> None:
+        """Run one strategy's cycle on its own cadence for the lifetime of the manager"""
+        while True:
             if not self.timing_service.is_trading_time():
-                logging.info("Outside trading hours, sleeping...")
                 await asyncio.sleep(300)
-                return
-
-            # Check if scalping should be paused due to other strategy activity
-            scalping_allowed = self._should_allow_scalping()
+                continue
 
-            # Prepare strategy tasks
-            strategy_tasks = []
+            if gate is not None:
+                await gate.wait()
 
-            # Always run main strategies
-            strategy_tasks.extend([
-                self.gap_up_strategy.run_strategy_cycle(),
-                self.breakout_strategy.run_breakout_cycle()
-            ])
+            cycle_started = asyncio.get_running_loop().time()
+            try:
+                await cycle()
+            except Exception as e:
+                logger.error("Error in %s strategy: %s", name, e)
+            self._perf_dirty = True
 
-            # Add scalping if allowed
-            if scalping_allowed:
-                strategy_tasks.append(self.scalping_strategy.run_scalping_cycle())
+            if wake is None:
+                await asyncio.sleep(interval)
             else:
-                logging.debug("Scalping paused due to other strategy activity")
-
-            # Run strategies concurrently
-            results = await asyncio.gather(*strategy_tasks, return_exceptions=True)
+                await self._wait_for_wake(wake, cycle_started, interval)
+
+    @staticmethod
+    async def _wait_for_wake(wake: asyncio.Event, cycle_started: float, interval: float) -> None:
+        """Sleep until the event fires or interval passes since cycle_started, but never start within MIN_WAKE_SPACING of it"""
+        loop = asyncio.get_running_loop()
+        # Every push sets the event; those arriving inside the floor collapse into one wake after it
+        spacing = cycle_started + MIN_WAKE_SPACING - loop.time()
+        if spacing > 0:
+            await asyncio.sleep(spacing)
+        if not wake.is_set():
+            try:
+                await asyncio.wait_for(wake.wait(), max(cycle_started + interval - loop.time(), 0))
+            except asyncio.TimeoutError:
+                return
+        wake.clear()
 
-            # Log any exceptions
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    strategy_names = ['gap_up', 'breakout', 'scalping']
-                    logging.error(f"Error in {strategy_names[i]} strategy: {result}")
+    async def _oversee(self, interval: float) -> None:
+        """Toggle the scalping gate and publish portfolio status on a fixed cadence"""
+        while True:
+            if not self.timing_service.is_trading_time():
+                logger.info("Outside trading hours, sleeping...")
+                await asyncio.sleep(300)
+                continue
 
-            # Update portfolio performance
-            self._update_portfolio_performance()
+            try:
+                position_counts = self._position_counts()
+                if self._should_allow_scalping(position_counts):
+                    self._scalping_allowed.set()
+                else:
+                    if self._scalping_allowed.is_set():
+                        logger.debug("Scalping paused due to other strategy activity")
+                    self._scalping_allowed.clear()
 
-            # Log combined performance
-            self._log_portfolio_status()
+                await self._update_after_cycle(position_counts)
+            except Exception as e:
+                logger.error(f"Error in strategy oversight: {e}")
 
-            # Update strategy coordination tracking
-            self._update_strategy_coordination()
+            await asyncio.sleep(interval)
 
-        except Exception as e:
-            logging.error(f"Error running multi-strategy with scalping: {e}")
+    def _position_counts(self) -> Tuple[int, int]:
+        """(gap_up, breakout) open position counts, read once per cycle"""
+        return self.gap_up_strategy.active_position_count, self.breakout_strategy.active_position_count
 
-    def _should_allow_scalping(self) -> bool:
+    def _should_allow_scalping(self, position_counts: Optional[Tuple[int, int]] = None) -> bool:
         """Determine if scalping should be allowed based on other strategy activity"""
 
         # If scalping not configured to avoid other signals, always allow
@@ -150,164 +249,190 @@ class EnhancedMultiStrategyWithScalping:
             return True
 
         # Check if there was recent activity in other strategies
-        if self.last_non_scalping_trade_time:
-            from datetime import datetime, timedelta
-            cooldown_period = timedelta(minutes=self.multi_config.cross_strategy_cooldown_minutes)
-            if datetime.now() - self.last_non_scalping_trade_time < cooldown_period:
-                return False
+        if (self.last_non_scalping_trade_time is not None and
+                time.monotonic() - self.last_non_scalping_trade_time < self._cooldown_seconds):
+            return False
 
         # Check if we're in signal generation time for other strategies
         if self.timing_service.is_signal_generation_time():
             # Check if other strategies have available slots (indicating they're actively looking)
-            gap_up_slots = self.multi_config.max_gap_up_positions - len(self.gap_up_strategy.positions)
-            breakout_slots = self.multi_config.max_breakout_positions - len(self.breakout_strategy.positions)
+            gap_up_positions, breakout_positions = position_counts or self._position_counts()
+            gap_up_slots = self.multi_config.max_gap_up_positions - gap_up_positions
+            breakout_slots = self.multi_config.max_breakout_positions - breakout_positions
 
             if gap_up_slots > 0 or breakout_slots > 0:
                 return False
 
         return True
 
-    def _update_strategy_coordination(self) -> None:
+    def _update_strategy_coordination(self, position_counts: Optional[Tuple[int, int]] = None) -> None:
         """Update coordination tracking between strategies"""
-        from datetime import datetime
-
         # Check for new trades in non-scalping strategies
-        gap_up_positions = len(self.gap_up_strategy.positions)
-        breakout_positions = len(self.breakout_strategy.positions)
+        gap_up_positions, breakout_positions = position_counts or self._position_counts()
 
         # Track if there's been recent activity (simplified check)
         current_activity = gap_up_positions + breakout_positions
-        if hasattr(self, '_last_activity_count'):
-            if current_activity > self._last_activity_count:
-                self.last_non_scalping_trade_time = datetime.now()
+        if current_activity > self._last_activity_count:
+            self.last_non_scalping_trade_time = time.monotonic()
 
         self._last_activity_count = current_activity
 
-    def _update_portfolio_performance(self) -> None:
+    async def _collect_perf(self) -> Tuple[StrategyPerf, StrategyPerf, StrategyPerf]:
+        """Collect all strategies' performance in one place, once per cycle"""
+        # Plain attribute reads of loop-owned state, so they run inline rather than in worker threads
+        gap_up_perf, breakout_perf, scalping_perf = self._cycle_perf
+        gap_up_perf.refresh(self.gap_up_strategy)
+        breakout_perf.refresh(self.breakout_strategy)
+        scalping_perf.refresh(self.scalping_strategy)
+        return self._cycle_perf
+
+    def _perf_snapshot(self) -> Tuple[Dict, Dict, Dict]:
+        """(gap_up, breakout, scalping) performance, refetched only after strategies have run"""
+        if self._perf_dirty or self._last_perf_snapshot is None:
+            self._last_perf_snapshot = (
+                self.gap_up_strategy.get_performance_summary_detailed(),
+                self.breakout_strategy.get_breakout_performance(),
+                self.scalping_strategy.get_scalping_performance()
+            )
+            self._perf_dirty = False
+        return self._last_perf_snapshot
+
+    def _update_portfolio_performance(self, gap_up_perf: StrategyPerf, breakout_perf: StrategyPerf,
+                                      scalping_perf: StrategyPerf) -> None:
         """Update overall portfolio performance including scalping"""
-        gap_up_perf = self.gap_up_strategy.get_performance_summary()
-        breakout_perf = self.breakout_strategy.get_breakout_performance()
-        scalping_perf = self.scalping_strategy.get_scalping_performance()
+        self.total_portfolio_pnl = gap_up_perf.total_pnl + breakout_perf.total_pnl + scalping_perf.total_pnl
+        self.daily_portfolio_pnl = gap_up_perf.daily_pnl + breakout_perf.daily_pnl + scalping_perf.daily_pnl
 
-        self.total_portfolio_pnl = (gap_up_perf['total_pnl'] +
-                                    breakout_perf['total_pnl'] +
-                                    scalping_perf['total_pnl'])
+    def _log_portfolio_status(self, gap_up_perf: StrategyPerf, breakout_perf: StrategyPerf,
+                              scalping_perf: StrategyPerf) -> None:
+        """Log overall portfolio status including scalping"""
+        if not logger.isEnabledFor(logging.INFO):
+            return
 
-        self.daily_portfolio_pnl = (gap_up_perf['daily_pnl'] +
-                                    breakout_perf['daily_pnl'] +
-                                    scalping_perf['daily_pnl'])
+        total_positions = (gap_up_perf.active_positions +
+                           breakout_perf.active_positions +
+                           scalping_perf.active_positions)
 
-    def _log_portfolio_status(self) -> None:
-        """Log overall portfolio status including scalping"""
-        gap_up_perf = self.gap_up_strategy.get_performance_summary()
-        breakout_perf = self.breakout_strategy.get_breakout_performance()
-        scalping_perf = self.scalping_strategy.get_scalping_performance()
-
-        total_positions = (gap_up_perf['active_positions'] +
-                           breakout_perf['active_positions'] +
-                           scalping_perf['active_positions'])
-
-        logging.info(f"=== ENHANCED PORTFOLIO STATUS ===")
-        logging.info(f"Total Positions: {total_positions}")
-        logging.info(f"Gap-Up Short: {gap_up_perf['active_positions']} positions, "
-                     f"PnL: Rs.{gap_up_perf['daily_pnl']:.2f}")
-        logging.info(f"Breakout: {breakout_perf['active_positions']} positions, "
-                     f"PnL: Rs.{breakout_perf['daily_pnl']:.2f}")
-        logging.info(f"Scalping: {scalping_perf['active_positions']} positions, "
-                     f"Trades: {scalping_perf['trades_today']}, "
-                     f"PnL: Rs.{scalping_perf['daily_pnl']:.2f}")
-        logging.info(f"Portfolio Daily PnL: Rs.{self.daily_portfolio_pnl:.2f}")
-        logging.info(f"Portfolio Total PnL: Rs.{self.total_portfolio_pnl:.2f}")
-
-    def get_comprehensive_performance(self) -> Dict:
+        # Skip the dump unless it is due or the positions/PnL moved materially since the last one
+        now = time.monotonic()
+        if (self._last_logged_pnl is not None and
+                now - self._last_log_ts < STATUS_LOG_INTERVAL and
+                total_positions == self._last_logged_positions and
+                abs(self.daily_portfolio_pnl - self._last_logged_pnl) < STATUS_LOG_PNL_DELTA):
+            return
+        self._last_log_ts = now
+        self._last_logged_pnl = self.daily_portfolio_pnl
+        self._last_logged_positions = total_positions
+
+        logger.info("=== ENHANCED PORTFOLIO STATUS ===")
+        logger.info("Total Positions: %d", total_positions)
+        logger.info("Gap-Up Short: %d positions, PnL: Rs.%.2f",
+                    gap_up_perf.active_positions, gap_up_perf.daily_pnl)
+        logger.info("Breakout: %d positions, PnL: Rs.%.2f",
+                    breakout_perf.active_positions, breakout_perf.daily_pnl)
+        logger.info("Scalping: %d positions, Trades: %d, PnL: Rs.%.2f",
+                    scalping_perf.active_positions, scalping_perf.trades_today, scalping_perf.daily_pnl)
+        logger.info("Portfolio Daily PnL: Rs.%.2f", self.daily_portfolio_pnl)
+        logger.info("Portfolio Total PnL: Rs.%.2f", self.total_portfolio_pnl)
+
+    def get_comprehensive_performance(self) -> ComprehensivePerformance:
         """Get comprehensive performance across all strategies"""
-        gap_up_perf = self.gap_up_strategy.get_performance_summary()
-        breakout_perf = self.breakout_strategy.get_breakout_performance()
-        scalping_perf = self.scalping_strategy.get_scalping_performance()
-
-        return {
-            'portfolio_summary': {
-                'total_pnl': self.total_portfolio_pnl,
-                'daily_pnl': self.daily_portfolio_pnl,
-                'total_positions': (gap_up_perf['active_positions'] +
-                                    breakout_perf['active_positions'] +
-                                    scalping_perf['active_positions']),
-                'strategies_active': 3
-            },
-            'strategy_breakdown': {
+        gap_up_perf, breakout_perf, scalping_perf = self._perf_snapshot()
+        gap_up_positions = gap_up_perf['active_positions']
+        breakout_positions = breakout_perf['active_positions']
+        scalping_positions = scalping_perf['active_positions']
+
+        return ComprehensivePerformance(
+            portfolio_summary=PortfolioSummary(
+                total_pnl=self.total_portfolio_pnl,
+                daily_pnl=self.daily_portfolio_pnl,
+                total_positions=gap_up_positions + breakout_positions + scalping_positions,
+                strategies_active=3
+            ),
+            strategy_breakdown={
                 'gap_up_short': gap_up_perf,
                 'open_breakout': breakout_perf,
                 'level2_scalping': scalping_perf
             },
-            'risk_metrics': {
-                'position_distribution': {
-                    'gap_up': gap_up_perf['active_positions'],
-                    'breakout': breakout_perf['active_positions'],
-                    'scalping': scalping_perf['active_positions']
+            risk_metrics=RiskMetrics(
+                position_distribution={
+                    'gap_up': gap_up_positions,
+                    'breakout': breakout_positions,
+                    'scalping': scalping_positions
                 },
-                'scalping_metrics': {
-                    'trades_today': scalping_perf['trades_today'],
-                    'avg_hold_time': self._calculate_avg_scalping_hold_time(),
-                    'scalping_frequency': f"{scalping_perf['trades_today']}/hour"
-                }
-            }
-        }
-
-    def _calculate_avg_scalping_hold_time(self) -> str:
-        """Calculate average hold time for scalping positions"""
-        scalping_perf = self.scalping_strategy.get_scalping_performance()
+                scalping_metrics=ScalpingMetrics(
+                    trades_today=scalping_perf['trades_today'],
+                    avg_hold_time=self._calculate_avg_scalping_hold_time(scalping_perf),
+                    scalping_frequency=f"{scalping_perf['trades_today']}/hour"
+                )
+            )
+        )
 
-        if not scalping_perf['positions_detail']:
-            return "N/A"
+    def _calculate_avg_scalping_hold_time(self, scalping_perf: Optional[Dict] = None) -> str:
+        """Calculate average hold time for scalping positions"""
+        if scalping_perf is None:
+            scalping_perf = self._perf_snapshot()[2]
 
-        total_hold_time = sum(
-            pos['hold_time_seconds'] for pos in scalping_perf['positions_detail']
-        )
-        avg_hold_time = total_hold_time / len(scalping_perf['positions_detail'])
+        # Single pass over the positions for both the total and the count
+        count = 0
+        total_hold_time = 0.0
+        for pos in scalping_perf['positions_detail']:
+            total_hold_time += pos['hold_time_seconds']
+            count += 1
 
-        return f"{avg_hold_time:.1f}s"
+        return f"{total_hold_time / count:.1f}s" if count else "N/A"
 
     async def run(self) -> None:
         """Main execution loop for enhanced multi-strategy with scalping"""
-        logging.info("Starting Enhanced Multi-Strategy Trading System with Level II Scalping")
+        logger.info("Starting Enhanced Multi-Strategy Trading System with Level II Scalping")
 
         if not await self.initialize():
-            logging.error("Enhanced multi-strategy initialization failed")
+            logger.error("Enhanced multi-strategy initialization failed")
             return
 
-        try:
-            while True:
-                await self.run_all_strategies_with_scalping()
+        # Each strategy runs in its own long-lived task; scalping ticks faster and waits on the oversight gate
+        interval = max(self.trading_config.monitoring_interval, 5)
+        self._tasks = [
+            asyncio.create_task(self._run_forever('gap_up', self.gap_up_strategy.run_strategy_cycle, interval),
+                                name='gap_up-cycle'),
+            asyncio.create_task(self._run_forever('breakout', self.breakout_strategy.run_breakout_cycle, interval),
+                                name='breakout-cycle'),
+            asyncio.create_task(self._run_forever('scalping', self.scalping_strategy.run_scalping_cycle,
+                                                  SCALPING_CYCLE_INTERVAL, self._scalping_allowed,
+                                                  self._tick_event),
+                                name='scalping-cycle'),
+            asyncio.create_task(self._oversee(interval), name='oversight'),
+            asyncio.create_task(self._watch_feed_health(), name='feed-watchdog'),
+        ]
 
-                # Shorter sleep interval for scalping responsiveness
-                await asyncio.sleep(max(self.trading_config.monitoring_interval, 5))
+        try:
+            await asyncio.gather(*self._tasks)
 
         except KeyboardInterrupt:
-            logging.info("Enhanced multi-strategy system stopped by user")
+            logger.info("Enhanced multi-strategy system stopped by user")
         except Exception as e:
-            logging.error(f"Fatal error in enhanced multi-strategy: {e}")
-
-
-def load_enhanced_config() -> Dict:
-    """Load enhanced configuration including scalping settings"""
-    return {
-        'fyers': FyersConfig(
-            client_id=os.environ.get('FYERS_CLIENT_ID'),
-            secret_key=os.environ.get('FYERS_SECRET_KEY'),
-            redirect_uri=os.environ.get('FYERS_REDIRECT_URI', 'https://trade.fyers.in/api-login/redirect-to-app'),
-            access_token=os.environ.get('FYERS_ACCESS_TOKEN')
-        ),
-        'strategy': StrategyConfig(
-            portfolio_value=float(os.environ.get('PORTFOLIO_VALUE', 1000000)),
-            risk_per_trade_pct=float(os.environ.get('RISK_PER_TRADE', 1.0)),
-            max_positions=int(os.environ.get('MAX_POSITIONS', 3)),
-            min_gap_percentage=float(os.environ.get('MIN_GAP_PERCENTAGE', 0.5)),
-            min_selling_pressure=float(os.environ.get('MIN_SELLING_PRESSURE', 40.0)),
-            min_volume_ratio=float(os.environ.get('MIN_VOLUME_RATIO', 1.2)),
-            min_confidence=float(os.environ.get('MIN_CONFIDENCE', 0.6)),
-            stop_loss_pct=float(os.environ.get('STOP_LOSS_PCT', 1.5)),
-            target_pct=float(os.environ.get('TARGET_PCT', 3.0))
-        ),
+            logger.error(f"Fatal error in enhanced multi-strategy: {e}")
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+            await asyncio.to_thread(self.tick_feed.stop)
+
+
+def load_enhanced_config() -> Mapping[str, Any]:
+    """Load read-only enhanced configuration including scalping settings (parsed once until a token refresh invalidates it)"""
+    load_env_once()
+    return _load_enhanced_env_config()
+
+
+@env_cached
+def _load_enhanced_env_config() -> Mapping[str, Any]:
+    """Build the enhanced config dicts from the environment"""
+    env = dict(os.environ)  # One snapshot instead of repeated os.environ proxy lookups
+    return MappingProxyType({
+        'fyers': FyersConfig(**parse_env(FYERS_ENV_SCHEMA, env)),
+        'strategy': StrategyConfig(**parse_env(STRATEGY_ENV_SCHEMA, env)),
         'trading': TradingConfig(
             market_start_hour=9,
             market_start_minute=15,
@@ -325,17 +450,7 @@ def load_enhanced_config() -> Dict:
             risk_reward_ratio=2.0,
             max_positions_per_strategy=2
         ),
-        'scalping': ScalpingConfig(
-            min_bid_ask_imbalance_ratio=float(os.environ.get('SCALPING_MIN_IMBALANCE', 2.5)),
-            min_volume_at_level=int(os.environ.get('SCALPING_MIN_VOLUME', 2000)),
-            max_positions=int(os.environ.get('SCALPING_MAX_POSITIONS', 1)),
-            position_size_percentage=float(os.environ.get('SCALPING_POSITION_SIZE', 0.15)),
-            stop_loss_ticks=int(os.environ.get('SCALPING_STOP_TICKS', 3)),
-            target_ticks=int(os.environ.get('SCALPING_TARGET_TICKS', 6)),
-            max_hold_seconds=int(os.environ.get('SCALPING_MAX_HOLD', 45)),
-            cooldown_seconds=int(os.environ.get('SCALPING_COOLDOWN', 120)),
-            min_confidence=float(os.environ.get('SCALPING_MIN_CONFIDENCE', 0.80))
-        ),
+        'scalping': ScalpingConfig(**parse_env(SCALPING_ENV_SCHEMA, env)),
         'multi_strategy_scalping': MultiStrategyScalpingConfig(
             scalping_allocation=0.1,
             gap_up_allocation=0.5,
@@ -346,26 +461,27 @@ def load_enhanced_config() -> Dict:
             max_breakout_positions=2,
             portfolio_stop_loss=4.0,
             daily_profit_target=3.0,
-            allow_scalping_during_signals=bool(os.environ.get('ALLOW_SCALPING_DURING_SIGNALS', False)),
-            cross_strategy_cooldown_minutes=int(os.environ.get('CROSS_STRATEGY_COOLDOWN', 5))
+            **parse_env(MULTI_SCALPING_ENV_SCHEMA, env)
         )
-    }
+    })
 
 
-def authenticate_fyers_enhanced(config: Dict) -> bool:
-    """Enhanced authentication that handles the scalping system requirements"""
+async def authenticate_fyers_enhanced(config: Mapping[str, Any]) -> Optional[FyersConfig]:
+    """Enhanced authentication that handles the scalping system requirements, returning the authenticated config"""
     from main_enhanced import FyersAuthManager
 
     auth_manager = FyersAuthManager()
-    access_token = auth_manager.get_valid_access_token()
+    try:
+        access_token = await auth_manager.get_valid_access_token_async()
+    finally:
+        await auth_manager.aclose()
 
     if access_token:
-        config['fyers'].access_token = access_token
-        logging.info("Enhanced Fyers authentication successful")
-        return True
+        logger.info("Enhanced Fyers authentication successful")
+        return replace(config['fyers'], access_token=access_token)
     else:
-        logging.error("Enhanced Fyers authentication failed")
-        return False
+        logger.error("Enhanced Fyers authentication failed")
+        return None
 
 
 async def main_enhanced_scalping_system():
@@ -375,13 +491,14 @@ async def main_enhanced_scalping_system():
         config = load_enhanced_config()
 
         # Handle authentication
-        if not authenticate_fyers_enhanced(config):
+        fyers_config = await authenticate_fyers_enhanced(config)
+        if not fyers_config:
             print("Authentication failed. Exiting...")
             return
 
         # Initialize enhanced multi-strategy manager with scalping
         enhanced_system = EnhancedMultiStrategyWithScalping(
-            config['fyers'],
+            fyers_config,
             config['strategy'],
             config['trading'],
             config['breakout'],
@@ -392,7 +509,7 @@ async def main_enhanced_scalping_system():
         await enhanced_system.run()
 
     except Exception as e:
-        logging.error(f"Fatal error in enhanced scalping system: {e}")
+        logger.error(f"Fatal error in enhanced scalping system: {e}")
 
 
 async def test_scalping_components():
@@ -403,20 +520,31 @@ async def test_scalping_components():
         # Load configuration
         config = load_enhanced_config()
 
-        if not authenticate_fyers_enhanced(config):
+        fyers_config = await authenticate_fyers_enhanced(config)
+        if not fyers_config:
             print("Authentication failed for testing")
             return
 
         # Test enhanced Fyers service
-        enhanced_fyers = EnhancedFyersService(config['fyers'])
+        enhanced_fyers = EnhancedFyersService(fyers_config)
 
         # Test symbols for Level II data
         test_symbols = ['TCS.NS', 'HDFCBANK.NS']
 
+        async def probe(symbol: str):
+            """Fetch one symbol's order book, keeping the error with the symbol"""
+            try:
+                return symbol, await enhanced_fyers.get_market_depth(symbol), None
+            except Exception as e:
+                return symbol, None, e
+
+        # Poll every symbol concurrently and report as each book arrives
         print("Testing Level II market data...")
-        for symbol in test_symbols:
+        for next_result in asyncio.as_completed([probe(symbol) for symbol in test_symbols]):
+            symbol, order_book, error = await next_result
             try:
-                order_book = await enhanced_fyers.get_market_depth(symbol)
+                if error is not None:
+                    raise error
                 if order_book:
                     print(f"✓ {symbol}: Bids={len(order_book.bids)}, Asks={len(order_book.asks)}, "
                           f"Spread={order_book.spread:.2f}")
@@ -496,25 +624,28 @@ CROSS_STRATEGY_COOLDOWN=5
 
 def main():
     """Enhanced main entry point with scalping options"""
+    # Records are written by a background listener thread
+    configure_logging('trading_strategy_with_scalping.log')
+
     if len(sys.argv) > 1:
         command = sys.argv[1].lower()
 
         if command == "scalping":
             print("Starting Enhanced Multi-Strategy System with Level II Scalping...")
-            asyncio.run(main_enhanced_scalping_system())
+            run_coroutine(main_enhanced_scalping_system())
         elif command == "test-scalping":
             print("Testing Level II Scalping Components...")
-            asyncio.run(test_scalping_components())
+            run_coroutine(test_scalping_components())
         elif command == "create-scalping-env":
             create_scalping_env_template()
         elif command == "multi":
             print("Starting Standard Multi-Strategy System...")
             from main_enhanced import main_multi_strategy
-            asyncio.run(main_multi_strategy())
+            run_coroutine(main_multi_strategy())
         elif command == "single":
             print("Starting Gap-Up Short Strategy...")
             from main_enhanced import main_single_strategy
-            asyncio.run(main_single_strategy())
+            run_coroutine(main_single_strategy())
         elif command == "auth":
             from main_enhanced import setup_auth_only
             setup_auth_only()
@@ -538,18 +669,18 @@ def main():
 
         if choice == "1":
             print("Starting Enhanced Multi-Strategy System with Level II Scalping...")
-            asyncio.run(main_enhanced_scalping_system())
+            run_coroutine(main_enhanced_scalping_system())
         elif choice == "2":
             print("Testing Level II Scalping Components...")
-            asyncio.run(test_scalping_components())
+            run_coroutine(test_scalping_components())
         elif choice == "3":
             print("Starting Standard Multi-Strategy System...")
             from main_enhanced import main_multi_strategy
-            asyncio.run(main_multi_strategy())
+            run_coroutine(main_multi_strategy())
         elif choice == "4":
             print("Starting Gap-Up Short Strategy...")
             from main_enhanced import main_single_strategy
-            asyncio.run(main_single_strategy())
+            run_coroutine(main_single_strategy())
         elif choice == "5":
             from main_enhanced import setup_auth_only
             setup_auth_only()
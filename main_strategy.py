@@ -1,11 +1,12 @@
 import asyncio
 import logging
-from typing import Dict
+import sys
+from typing import Dict, Optional
 from datetime import datetime
 from config.settings import FyersConfig, StrategyConfig, TradingConfig
-from models.trading_models import Position
+from models.trading_models import Position, PositionBook
 from services.fyers_service import FyersService
-from services.analysis_service import TechnicalAnalysisService
+from services.analysis_service import TechnicalAnalysisService, market_hours_elapsed_now
 from services.signal_service import SignalGenerationService
 from services.position_service import PositionManagementService
 from services.market_timing_service import MarketTimingService
@@ -20,10 +21,11 @@ class GapUpShortStrategy:
     def __init__(self,
                  fyers_config: FyersConfig,
                  strategy_config: StrategyConfig,
-                 trading_config: TradingConfig):
+                 trading_config: TradingConfig,
+                 fyers_service: Optional[FyersService] = None):
 
-        # Initialize services
-        self.fyers_service = FyersService(fyers_config)
+        # Initialize services (reuse the caller's service so its connection pool is shared)
+        self.fyers_service = fyers_service or FyersService(fyers_config)
         self.analysis_service = TechnicalAnalysisService(self.fyers_service)
         self.signal_service = SignalGenerationService(self.fyers_service, self.analysis_service)
         self.position_service = PositionManagementService(self.fyers_service, self.fyers_service)
@@ -34,20 +36,28 @@ class GapUpShortStrategy:
         self.trading_config = trading_config
 
         # State
-        self.positions: Dict[str, Position] = {}
+        self.positions = PositionBook(strategy_config.max_positions)  # Columnar, priced in one pass
         self.daily_pnl = 0.0
         self.total_pnl = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None  # Cached by initialize()
+
+    @property
+    def active_position_count(self) -> int:
+        """Number of open positions"""
+        return len(self.positions)
 
     async def initialize(self) -> bool:
         """Initialize strategy and verify connections"""
+        self._loop = asyncio.get_running_loop()
+
         try:
             # Verify Fyers connection
-            profile = self.fyers_service._make_request('GET', '/profile')
+            profile = await asyncio.to_thread(self.fyers_service._make_request, 'GET', '/profile')
             if not profile:
                 logger.error("Failed to connect to Fyers API")
                 return False
 
-            logger.info(f"Connected to Fyers: {profile.get('name', 'Unknown')}")
+            logger.info("Connected to Fyers: %s", profile.get('name', 'Unknown'))
             return True
 
         except Exception as e:
@@ -64,8 +74,7 @@ class GapUpShortStrategy:
 
             # Log closed positions
             for closed_pos in pnl_summary.closed_positions:
-                logger.info(f"Position closed: {closed_pos['symbol']}, "
-                            f"PnL: Rs.{closed_pos['pnl']:.2f}")
+                logger.info("Position closed: %s, PnL: Rs.%.2f", closed_pos['symbol'], closed_pos['pnl'])
 
             # Generate new signals if in signal generation window
             if self.timing_service.is_signal_generation_time():
@@ -81,27 +90,38 @@ class GapUpShortStrategy:
         """Generate and execute new trading signals"""
         try:
             # Check available position slots
-            available_slots = self.strategy_config.max_positions - len(self.positions)
+            available_slots = self.strategy_config.max_positions - self.active_position_count
             if available_slots <= 0:
                 return
 
+            # Session clock for this cycle, shared by every symbol's volume estimate
+            elapsed = market_hours_elapsed_now()
+
             # Get index data
             index_data = await self.fyers_service.get_index_data()
 
             # Generate signals
-            signals = await self.signal_service.generate_signals(index_data, self.strategy_config)
+            signals = await self.signal_service.generate_signals(index_data, self.strategy_config, elapsed)
+
+            # Execute top signals concurrently; the semaphore caps orders in flight and each
+            # successful order keeps its permit for execution_delay to respect broker rate limits
+            order_slots = asyncio.Semaphore(self.trading_config.max_concurrent_orders)
 
-            # Execute top signals
-            executed_count = 0
-            for signal in signals[:available_slots]:
-                if signal.confidence >= self.strategy_config.min_confidence:
+            async def guarded(signal: TradingSignal) -> bool:
+                async with order_slots:
                     success = await self._execute_signal(signal)
                     if success:
-                        executed_count += 1
                         await asyncio.sleep(self.trading_config.execution_delay)
+                    return success
 
+            results = await asyncio.gather(*(
+                guarded(signal) for signal in signals[:available_slots]
+                if signal.confidence >= self.strategy_config.min_confidence
+            ))
+
+            executed_count = sum(results)
             if executed_count > 0:
-                logger.info(f"Executed {executed_count} new trades")
+                logger.info("Executed %d new trades", executed_count)
 
         except Exception as e:
             logger.error(f"Error in signal generation/execution: {e}")
@@ -117,7 +137,8 @@ class GapUpShortStrategy:
                 return False
 
             # Execute trade
-            order_result = self.position_service.execute_trade(signal, quantity)
+            # Blocking broker call; run it off the loop so concurrent orders overlap
+            order_result = await asyncio.to_thread(self.position_service.execute_trade, signal, quantity)
 
             if order_result:
                 # Create position record
@@ -134,8 +155,8 @@ class GapUpShortStrategy:
 
                 self.positions[signal.symbol] = position
 
-                logger.info(f"New position: {signal.symbol} - Qty: {quantity}, "
-                            f"Entry: Rs.{signal.entry_price:.2f}")
+                logger.info("New position: %s - Qty: %d, Entry: Rs.%.2f",
+                            signal.symbol, quantity, signal.entry_price)
                 return True
 
             return False
@@ -146,17 +167,25 @@ class GapUpShortStrategy:
 
     def _log_status(self, unrealized_pnl: float) -> None:
         """Log current strategy status"""
-        logger.info(f"Strategy Status - Active Positions: {len(self.positions)}, "
-                    f"Daily PnL: Rs.{self.daily_pnl:.2f}, "
-                    f"Total PnL: Rs.{self.total_pnl:.2f}, "
-                    f"Unrealized: Rs.{unrealized_pnl:.2f}")
+        if not logger.isEnabledFor(logging.INFO):
+            return
 
-    def get_performance_summary(self) -> Dict:
-        """Get comprehensive performance summary"""
+        logger.info("Strategy Status - Active Positions: %d, Daily PnL: Rs.%.2f, "
+                    "Total PnL: Rs.%.2f, Unrealized: Rs.%.2f",
+                    self.active_position_count, self.daily_pnl, self.total_pnl, unrealized_pnl)
+
+    def get_performance_summary_light(self) -> Dict:
+        """Headline figures only, cheap enough to poll every cycle"""
         return {
             'total_pnl': self.total_pnl,
             'daily_pnl': self.daily_pnl,
-            'active_positions': len(self.positions),
+            'active_positions': self.active_position_count
+        }
+
+    def get_performance_summary_detailed(self) -> Dict:
+        """Get comprehensive performance summary, including per-position detail"""
+        return {
+            **self.get_performance_summary_light(),
             'positions_detail': [
                 {
                     'symbol': pos.symbol,
@@ -170,6 +199,8 @@ class GapUpShortStrategy:
             ]
         }
 
+    get_performance_summary = get_performance_summary_detailed
+
     async def run(self) -> None:
         """Main strategy execution loop"""
         logger.info("Starting Gap-Up Short Selling Strategy")
@@ -183,14 +214,14 @@ class GapUpShortStrategy:
                 # Check trading hours
                 if not self.timing_service.is_trading_time():
                     logger.info("Outside trading hours, sleeping...")
-                    await asyncio.sleep(300)  # 5 minutes
+                    await self._sleep_until_boundary(300)  # 5 minutes
                     continue
 
                 # Run strategy cycle
                 await self.run_strategy_cycle()
 
-                # Sleep until next cycle
-                await asyncio.sleep(self.trading_config.monitoring_interval)
+                # Sleep until next cycle boundary, so cycle runtime does not accumulate as drift
+                await self._sleep_until_boundary(self.trading_config.monitoring_interval)
 
         except KeyboardInterrupt:
             logger.info("Strategy stopped by user")
@@ -198,5 +229,24 @@ class GapUpShortStrategy:
             logger.error(f"Fatal error in strategy: {e}")
         finally:
             # Print final performance
-            performance = self.get_performance_summary()
-            logger.info(f"Final Performance: Total PnL: Rs.{performance['total_pnl']:.2f}")
\ No newline at end of file
+            performance = self.get_performance_summary_detailed()
+            logger.info("Final Performance: Total PnL: Rs.%.2f, Open Positions: %d",
+                        performance['total_pnl'], len(performance['positions_detail']))
+
+    async def _sleep_until_boundary(self, interval: float) -> None:
+        """Sleep to the next multiple of interval on the loop clock"""
+        now = self._loop.time()
+        await asyncio.sleep((now // interval + 1) * interval - now)
+
+
+if __name__ == "__main__":
+    # Register this module under its import name so main_enhanced reuses it instead of loading a second copy
+    sys.modules.setdefault('main_strategy', sys.modules[__name__])
+
+    # Run the strategy standalone on the uvloop-backed runner (same path as `main_enhanced.py single`)
+    from main_enhanced import main_single_strategy
+    from utils.event_loop import run_coroutine
+    from utils.logging_setup import configure_logging
+
+    configure_logging('trading_strategy.log')
+    run_coroutine(main_single_strategy())
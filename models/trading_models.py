@@ -1,10 +1,12 @@
-from dataclasses import dataclass
+from collections.abc import Mapping, MutableMapping
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
 from config.settings import Sector
 
 
-@dataclass
+@dataclass(slots=True)
 class TradingSignal:
     symbol: str
     sector: Sector
@@ -19,7 +21,7 @@ class TradingSignal:
     timestamp: datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     symbol: str
     entry_price: float
@@ -32,7 +34,7 @@ class Position:
     sl_order_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class MarketData:
     symbol: str
     current_price: float
@@ -44,7 +46,131 @@ class MarketData:
     timestamp: datetime
 
 
-@dataclass
+def _empty_column(dtype=np.float64) -> np.ndarray:
+    return np.empty(0, dtype=dtype)
+
+
+@dataclass(slots=True, eq=False)
+class QuoteFrame(Mapping):
+    """Columnar quotes for many symbols; MarketData rows are built only on access"""
+    symbols: Tuple[str, ...] = ()
+    current_price: np.ndarray = field(default_factory=_empty_column)
+    open_price: np.ndarray = field(default_factory=_empty_column)
+    high_price: np.ndarray = field(default_factory=_empty_column)
+    low_price: np.ndarray = field(default_factory=_empty_column)
+    volume: np.ndarray = field(default_factory=lambda: _empty_column(np.int64))
+    previous_close: np.ndarray = field(default_factory=_empty_column)
+    timestamp: Optional[datetime] = None
+    _index: Dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    @property
+    def gap_percentage(self) -> np.ndarray:
+        """Open vs previous close in percent, 0 where previous close is missing"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gap = (self.open_price - self.previous_close) / self.previous_close * 100
+        return np.where(self.previous_close > 0, gap, 0.0)
+
+    def row(self, i: int) -> MarketData:
+        """Materialize a single symbol as MarketData"""
+        return MarketData(
+            symbol=self.symbols[i],
+            current_price=float(self.current_price[i]),
+            open_price=float(self.open_price[i]),
+            high_price=float(self.high_price[i]),
+            low_price=float(self.low_price[i]),
+            volume=int(self.volume[i]),
+            previous_close=float(self.previous_close[i]),
+            timestamp=self.timestamp
+        )
+
+    def __getitem__(self, symbol: str) -> MarketData:
+        return self.row(self._index[symbol])
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbols)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+
+class PositionBook(MutableMapping):
+    """Open positions keyed by symbol, with the numeric fields mirrored into parallel numpy columns"""
+
+    __slots__ = ('entry_prices', 'quantities', 'stop_losses', 'targets', 'active',
+                 '_positions', '_index')
+
+    def __init__(self, capacity: int = 8):
+        capacity = max(capacity, 1)
+        self.entry_prices = np.zeros(capacity)
+        self.quantities = np.zeros(capacity, dtype=np.int64)
+        self.stop_losses = np.zeros(capacity)
+        self.targets = np.zeros(capacity)
+        self.active = np.zeros(capacity, dtype=bool)  # Slot occupancy; False marks a free slot
+        self._positions: List[Optional[Position]] = [None] * capacity
+        self._index: Dict[str, int] = {}  # symbol -> slot
+
+    @property
+    def capacity(self) -> int:
+        return len(self.active)
+
+    def _grow(self) -> None:
+        capacity = self.capacity * 2
+        for name in ('entry_prices', 'quantities', 'stop_losses', 'targets', 'active'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+        self._positions.extend([None] * (capacity - len(self._positions)))
+
+    def open_slots(self) -> np.ndarray:
+        """Indices of occupied slots, for slicing the columns"""
+        return np.flatnonzero(self.active)
+
+    def position_at(self, slot: int) -> Position:
+        return self._positions[slot]
+
+    def __setitem__(self, symbol: str, position: Position) -> None:
+        slot = self._index.get(symbol)
+        if slot is None:
+            free = np.flatnonzero(~self.active)
+            if not len(free):
+                self._grow()
+                free = np.flatnonzero(~self.active)
+            slot = int(free[0])
+            self._index[symbol] = slot
+
+        self.entry_prices[slot] = position.entry_price
+        self.quantities[slot] = position.quantity
+        self.stop_losses[slot] = position.stop_loss
+        self.targets[slot] = position.target_price
+        self.active[slot] = True
+        self._positions[slot] = position
+
+    def __getitem__(self, symbol: str) -> Position:
+        return self._positions[self._index[symbol]]
+
+    def __delitem__(self, symbol: str) -> None:
+        slot = self._index.pop(symbol)
+        self.active[slot] = False
+        self._positions[slot] = None
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+@dataclass(slots=True)
 class PnLSummary:
     realized_pnl: float = 0.0
     unrealized_pnl: float = 0.0
@@ -52,4 +178,49 @@ class PnLSummary:
 
     def __post_init__(self):
         if self.closed_positions is None:
-            self.closed_positions = []
\ No newline at end of file
+            self.closed_positions = []
+
+
+@dataclass(slots=True)
+class StrategyPerf:
+    """Per-strategy headline figures, refreshed in place every cycle"""
+    total_pnl: float = 0.0
+    daily_pnl: float = 0.0
+    active_positions: int = 0
+    trades_today: int = 0
+
+    def refresh(self, strategy) -> None:
+        """Copy the current figures from a strategy without allocating"""
+        self.total_pnl = strategy.total_pnl
+        self.daily_pnl = strategy.daily_pnl
+        self.active_positions = strategy.active_position_count
+        self.trades_today = getattr(strategy, 'trades_today', 0)
+
+
+@dataclass(slots=True)
+class PortfolioSummary:
+    total_pnl: float
+    daily_pnl: float
+    total_positions: int
+    strategies_active: int
+
+
+@dataclass(slots=True)
+class ScalpingMetrics:
+    trades_today: int
+    avg_hold_time: str
+    scalping_frequency: str
+
+
+@dataclass(slots=True)
+class RiskMetrics:
+    position_distribution: Dict[str, int]
+    scalping_metrics: ScalpingMetrics
+
+
+@dataclass(slots=True)
+class ComprehensivePerformance:
+    """Portfolio-wide performance report across all strategies"""
+    portfolio_summary: PortfolioSummary
+    strategy_breakdown: Dict[str, Dict]
+    risk_metrics: RiskMetrics
@@ -2,8 +2,10 @@ import numpy as np
 import pandas as pd
 import logging
 import pytz
+from typing import List, Optional
 from interfaces.data_provider import IDataProvider
 from models.trading_models import MarketData
+from utils.jit import NUMBA_AVAILABLE, njit, prange
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -11,6 +13,108 @@ logger = logging.getLogger(__name__)
 # Add IST timezone handling
 IST = pytz.timezone('Asia/Kolkata')
 
+RSI_PERIOD = 14
+
+
+def market_hours_elapsed_now() -> float:
+    """Hours since the 9:15 IST open, floored at 0.5; computed once per cycle by callers"""
+    now = datetime.now(IST)
+    return max((now.hour - 9) + (now.minute - 15) / 60, 0.5)
+
+
+@njit(cache=True)
+def _sps_kernel(close, open_, volume, rsi_period):
+    """(price_decline, red_ratio, volume_trend, lower_closes_ratio, rsi) in one pass over the window"""
+    n = close.shape[0]
+    rsi_start = n - rsi_period  # First bar whose delta falls inside the RSI window
+    red = 0
+    lower = 0
+    head_volume = 0.0
+    tail_volume = 0.0
+    gain_sum = 0.0
+    loss_sum = 0.0
+
+    for i in range(n):
+        if close[i] < open_[i]:
+            red += 1
+        if i < 3:
+            head_volume += volume[i]
+        if i >= n - 2:
+            tail_volume += volume[i]
+        if i == 0:
+            continue
+
+        delta = close[i] - close[i - 1]
+        if delta < 0:
+            lower += 1
+
+        # Simple-average RSI over the last rsi_period deltas (all of them in a shorter window)
+        if i >= rsi_start:
+            if delta > 0:
+                gain_sum += delta
+            elif delta < 0:
+                loss_sum -= delta
+
+    price_decline = (close[n - 1] - close[0]) / close[0]
+    red_ratio = red / n
+    head_mean = head_volume / min(n, 3)
+    volume_trend = (tail_volume / min(n, 2)) / head_mean if head_mean > 0 else 1.0
+    lower_closes = lower / (n - 1)
+
+    if loss_sum > 0:
+        rsi = 100.0 - 100.0 / (1.0 + gain_sum / loss_sum)
+    elif gain_sum > 0:
+        rsi = 100.0
+    else:
+        rsi = 50.0
+
+    return price_decline, red_ratio, volume_trend, lower_closes, rsi
+
+
+@njit(cache=True)
+def _sps_score(close, open_, volume, rsi_period):
+    """Weighted selling pressure score in [0, 100]"""
+    price_decline, red_ratio, volume_trend, lower_closes, rsi = _sps_kernel(close, open_, volume, rsi_period)
+    score = (
+            (-price_decline * 100 * 0.3) +
+            (red_ratio * 100 * 0.2) +
+            (volume_trend * 20 * 0.2) +
+            (lower_closes * 100 * 0.2) +
+            ((100 - rsi) * 0.1)
+    )
+    return min(max(score, 0.0), 100.0)
+
+
+@njit(cache=True, parallel=True)
+def _sps_batch_kernel(panel, valid, rsi_period):
+    """Score every symbol of a (n_symbols, 3, period) Close/Open/Volume panel in one parallel pass"""
+    n_symbols = panel.shape[0]
+    out = np.zeros(n_symbols)
+    for i in prange(n_symbols):
+        if valid[i]:
+            out[i] = _sps_score(panel[i, 0], panel[i, 1], panel[i, 2], rsi_period)
+    return out
+
+
+def _sps_window(hist: pd.DataFrame, period_days: int) -> Optional[np.ndarray]:
+    """(3, period_days) contiguous Close/Open/Volume rows of finite bars, or None when too few remain"""
+    values = hist[['Close', 'Open', 'Volume']].to_numpy(dtype=np.float64)
+    window = values[np.isfinite(values).all(axis=1)][-period_days:]
+    if len(window) < max(period_days, 2):
+        return None
+    return np.ascontiguousarray(window.T)
+
+
+def warmup() -> None:
+    """Compile the kernels up front so the first trading cycle does not pay the JIT cost"""
+    dummy = np.ones(5, dtype=np.float64)
+    _sps_score(dummy, dummy, dummy, RSI_PERIOD)
+    _sps_batch_kernel(np.ones((1, 3, 5)), np.ones(1, dtype=np.bool_), RSI_PERIOD)
+
+
+if NUMBA_AVAILABLE:
+    warmup()
+
 
 class TechnicalAnalysisService:
     """Service for technical analysis calculations"""
@@ -23,54 +127,51 @@ class TechnicalAnalysisService:
         try:
             hist = self.data_provider.get_historical_data(symbol, f"{period_days + 5}d")
 
-            if len(hist) < period_days:
+            window = _sps_window(hist, period_days)
+            if window is None:
                 return 0.0
 
-            recent_data = hist.tail(period_days)
-
-            # Price decline
-            price_decline = (recent_data['Close'].iloc[-1] - recent_data['Close'].iloc[0]) / recent_data['Close'].iloc[0]
-
-            # Red candles ratio
-            red_candles = (recent_data['Close'] < recent_data['Open']).sum() / len(recent_data)
-
-            # Volume trend
-            volume_trend = (recent_data['Volume'].tail(2).mean() / recent_data['Volume'].head(3).mean())
-
-            # Lower closes ratio
-            lower_closes = (recent_data['Close'].diff() < 0).sum() / (len(recent_data) - 1)
-
-            # RSI calculation
-            rsi = self._calculate_rsi(recent_data['Close'])
-
-            # Weighted score
-            score = (
-                    (-price_decline * 100 * 0.3) +
-                    (red_candles * 100 * 0.2) +
-                    (volume_trend * 20 * 0.2) +
-                    (lower_closes * 100 * 0.2) +
-                    ((100 - rsi) * 0.1)
-            )
-
-            return min(max(score, 0), 100)
+            close, open_, volume = window
+            return float(_sps_score(close, open_, volume, RSI_PERIOD))
 
         except Exception as e:
             logger.error(f"Error calculating selling pressure for {symbol}: {e}")
             return 0.0
 
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> float:
+    def calculate_selling_pressure_batch(self, symbols: List[str], period_days: int = 5) -> np.ndarray:
+        """Selling pressure scores for many symbols, aligned with symbols; 0.0 where history is missing"""
+        panel = np.zeros((len(symbols), 3, period_days), dtype=np.float64)
+        valid = np.zeros(len(symbols), dtype=np.bool_)
+
+        for i, symbol in enumerate(symbols):
+            try:
+                hist = self.data_provider.get_historical_data(symbol, f"{period_days + 5}d")
+                window = _sps_window(hist, period_days)
+                if window is None:
+                    continue
+                panel[i] = window
+                valid[i] = True
+            except Exception as e:
+                logger.error(f"Error loading history for {symbol}: {e}")
+
+        try:
+            return _sps_batch_kernel(panel, valid, RSI_PERIOD)
+        except Exception as e:
+            logger.error(f"Error calculating batch selling pressure: {e}")
+            return np.zeros(len(symbols))
+
+    def _calculate_rsi(self, prices: pd.Series, period: int = RSI_PERIOD) -> float:
         """Calculate RSI"""
         try:
-            delta = prices.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=min(period, len(delta))).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=min(period, len(delta))).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs)).iloc[-1]
-            return rsi if not np.isnan(rsi) else 50.0
-        except:
+            close = np.ascontiguousarray(prices.to_numpy(), dtype=np.float64)
+            if len(close) < 2:
+                return 50.0
+            return float(_sps_kernel(close, close, close, period)[4])
+        except Exception:
             return 50.0
 
-    async def calculate_volume_ratio(self, symbol: str, market_data: MarketData) -> float:
+    async def calculate_volume_ratio(self, symbol: str, market_data: MarketData,
+                                     market_hours_elapsed: float) -> float:
         """Calculate volume ratio vs average"""
         try:
             hist = self.data_provider.get_historical_data(symbol, "20d")
@@ -80,11 +181,7 @@ class TechnicalAnalysisService:
             avg_volume = hist['Volume'].mean()
             current_volume = market_data.volume
 
-            # Estimate full day volume
-            now = datetime.now(IST)
-            market_hours_elapsed = (now.hour - 9) + (now.minute - 15) / 60
-            market_hours_elapsed = max(market_hours_elapsed, 0.5)
-
+            # Estimate full day volume (market_hours_elapsed comes from market_hours_elapsed_now())
             estimated_full_day_volume = current_volume * (6.5 / market_hours_elapsed)
             volume_ratio = estimated_full_day_volume / avg_volume if avg_volume > 0 else 1.0
 
@@ -0,0 +1,92 @@
+# services/cache.py
+
+import functools
+import hashlib
+import logging
+import os
+import pickle
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = '.cache'
+INTRADAY_TTL = 60  # Periods of a day or less still move during the session
+DAILY_TTL = 6 * 3600
+
+
+class FileCache:
+    """Pickle-backed on-disk cache with per-entry expiry and an in-process front layer"""
+
+    def __init__(self, directory: str = CACHE_DIR, ttl_seconds: float = 3600):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self._memory: Dict[str, Tuple[float, Any]] = {}  # key -> (wall-clock time stored, value)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.md5(key.encode()).hexdigest() + '.pkl')
+
+    def get(self, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+        """Return the cached value if it is younger than ttl, else None"""
+        ttl = self.ttl_seconds if ttl is None else ttl
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None and now - entry[0] < ttl:
+            return entry[1]
+
+        path = self._path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if now - stored_at >= ttl:
+                return None
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+
+        self._memory[key] = (stored_at, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value in memory and on disk (written atomically)"""
+        self._memory[key] = (time.time(), value)
+
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write cache entry {path}: {e}")
+
+
+def history_ttl(period: str) -> float:
+    """Expiry for a history window: short for intraday periods, hours for multi-day ones"""
+    return INTRADAY_TTL if period in ('1d', '5m', '15m', '30m', '60m', '1h') else DAILY_TTL
+
+
+def cache_historical_data(cache: FileCache) -> Callable:
+    """Decorate get_historical_data(self, symbol, period) so repeat fetches are served from cache"""
+    def decorator(fetch: Callable[..., pd.DataFrame]) -> Callable[..., pd.DataFrame]:
+        @functools.wraps(fetch)
+        def wrapper(self, symbol: str, period: str) -> pd.DataFrame:
+            key = f"history:{symbol}:{period}"
+            hist = cache.get(key, history_ttl(period))
+            if hist is not None:
+                return hist
+
+            hist = fetch(self, symbol, period)
+            # Failed fetches come back empty; do not pin those for the whole TTL
+            if len(hist):
+                cache.set(key, hist)
+            return hist
+        return wrapper
+    return decorator
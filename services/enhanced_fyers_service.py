@@ -5,48 +5,242 @@ import logging
 import pandas as pd
 import yfinance as yf
 import asyncio
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime, timedelta
+import time
+import numpy as np
+from collections import deque
+from operator import itemgetter
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from datetime import datetime
 from dataclasses import dataclass
 
 from config.settings import FyersConfig
 from services.fyers_service import FyersService
+from services.market_feed_service import FyersTickFeed
+from utils.jit import NUMBA_AVAILABLE, njit, prange
 from models.trading_models import MarketData
 
 logger = logging.getLogger(__name__)
 
-
-@dataclass
-class OrderBookLevel:
-    """Represents a level in the order book"""
-    price: float
-    quantity: int
-    orders: int
-    side: str  # 'BID' or 'ASK'
+NS_PER_SECOND = 1_000_000_000
+DEPTH_CACHE_TTL_NS = NS_PER_SECOND  # Polled Level II data should be very fresh
+FEED_BOOK_MAX_AGE_NS = 3 * NS_PER_SECOND  # Pushed books older than this are re-polled over REST
+TICK_HISTORY_SIZE = 1024  # Trades kept per symbol from the WebSocket feed
+DEPTH_LEVELS = 5  # Levels per side in Fyers depth messages
+
+
+# int8 side codes for order flow kernels; anything else is coded -1 and ignored
+SIDE_CODES = {'BUY': 1, 'SELL': 0}
+
+
+@njit(cache=True, fastmath=True)
+def _side_volumes(quantities, sides):
+    """(buy volume, sell volume) over parallel quantity/side-code arrays"""
+    return np.sum(quantities * (sides == 1)), np.sum(quantities * (sides == 0))
+
+
+# Bit i of the _scalping_mask result is the condition named SCALPING_CONDITION_KEYS[i]
+SCALPING_CONDITION_KEYS = ('adequate_spread', 'sufficient_volume', 'stable_book', 'good_imbalance', 'active_trading')
+
+
+@njit(cache=True)
+def _scalping_mask(spread, mid_price, best_bid_volume, best_ask_volume, n_bids, n_asks,
+                   imbalance_ratio, recent_volume):
+    """Pack the five scalping conditions into one bitmask"""
+    spread_bps = spread / mid_price * 10000 if spread > 0 and mid_price > 0 else 0.0
+    adequate_spread = 5 <= spread_bps <= 50  # 0.5 to 5 bps
+    sufficient_volume = n_bids > 0 and n_asks > 0 and best_bid_volume + best_ask_volume >= 500
+    stable_book = n_bids >= 3 and n_asks >= 3
+    good_imbalance = imbalance_ratio >= 1.5 or imbalance_ratio <= 0.67
+    active_trading = recent_volume >= 1000
+    return (int(adequate_spread) | int(sufficient_volume) << 1 | int(stable_book) << 2 |
+            int(good_imbalance) << 3 | int(active_trading) << 4)
+
+
+@njit(cache=True)
+def _realized_vol(close):
+    """Annualized volatility (%) of simple returns over a close series, in one pass"""
+    # Bars without a usable close (NaN, inf or zero) are skipped; returns link consecutive valid closes
+    n = 0
+    total = 0.0
+    total_sq = 0.0
+    prev = 0.0
+    for i in range(close.shape[0]):
+        c = close[i]
+        if not (np.isfinite(c) and c > 0):
+            continue
+        if prev > 0:
+            r = c / prev - 1.0
+            total += r
+            total_sq += r * r
+            n += 1
+        prev = c
+    if n < 2:
+        return 0.0
+    variance = (total_sq - total * total / n) / (n - 1)  # Sample variance, as pandas std()
+    return np.sqrt(max(variance, 0.0) * 252) * 100
+
+
+@njit(cache=True, parallel=True)
+def _realized_vol_batch(closes, valid):
+    """_realized_vol for each row of an (n_symbols, period) close matrix"""
+    out = np.zeros(closes.shape[0])
+    for i in prange(closes.shape[0]):
+        if valid[i]:
+            out[i] = _realized_vol(closes[i])
+    return out
+
+
+if NUMBA_AVAILABLE:
+    # Compile up front so the first scalping cycle does not pay the JIT cost
+    _side_volumes(np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int8))
+    _scalping_mask(0.0, 0.0, 0, 0, 0, 0, 1.0, 0)
+    _realized_vol_batch(np.ones((1, 5)), np.ones(1, dtype=np.bool_))
+
+
+# One order book level; bids/asks are structured arrays of these, best level first
+BOOK_LEVEL_DTYPE = np.dtype([('price', 'f8'), ('quantity', 'i8'), ('orders', 'i4')])
+
+
+# Fyers depth levels always carry these keys; fetched in C without per-key default handling
+_LEVEL_FIELDS = itemgetter('price', 'volume', 'orders')
+
+
+def parse_book_levels(levels, descending: bool) -> np.ndarray:
+    """Build a price-sorted structured array from Fyers depth levels"""
+    try:
+        book = np.fromiter(map(_LEVEL_FIELDS, levels), dtype=BOOK_LEVEL_DTYPE, count=len(levels))
+    except KeyError:
+        # Levels missing a key (e.g. no 'orders' count) take the defaulting path
+        book = np.fromiter(
+            ((level.get('price', 0), level.get('volume', 0), level.get('orders', 1)) for level in levels),
+            dtype=BOOK_LEVEL_DTYPE, count=len(levels)
+        )
+    # argsort on the contiguous price column; no per-level Python key callbacks
+    order = np.argsort(book['price'], kind='stable')
+    return book[order[::-1] if descending else order]
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderBookSnapshot:
     """Complete order book snapshot"""
     symbol: str
-    timestamp: datetime
-    bids: List[OrderBookLevel]
-    asks: List[OrderBookLevel]
+    timestamp_ns: int  # time.time_ns() when the snapshot was built
+    bids: np.ndarray  # BOOK_LEVEL_DTYPE, highest price first
+    asks: np.ndarray  # BOOK_LEVEL_DTYPE, lowest price first
     last_traded_price: float
     last_traded_quantity: int
     spread: float
     mid_price: float
 
+    # Column views of the ladders for vectorized analytics
+    @property
+    def bid_prices(self) -> np.ndarray:
+        return self.bids['price']
+
+    @property
+    def bid_sizes(self) -> np.ndarray:
+        return self.bids['quantity']
+
+    @property
+    def ask_prices(self) -> np.ndarray:
+        return self.asks['price']
 
-@dataclass
+    @property
+    def ask_sizes(self) -> np.ndarray:
+        return self.asks['quantity']
+
+    @property
+    def timestamp(self) -> datetime:
+        """Wall-clock time of the snapshot, for display and persistence"""
+        return datetime.fromtimestamp(self.timestamp_ns / NS_PER_SECOND)
+
+
+@dataclass(slots=True)
 class TickData:
     """Individual tick data"""
     symbol: str
-    timestamp: datetime
+    timestamp_ns: int  # time.time_ns() of the trade
     price: float
     quantity: int
     side: str  # 'BUY' or 'SELL'
 
+    @property
+    def timestamp(self) -> datetime:
+        """Wall-clock time of the tick, for display and persistence"""
+        return datetime.fromtimestamp(self.timestamp_ns / NS_PER_SECOND)
+
+
+class _RequestBatcher:
+    """Coalesces concurrent per-symbol lookups into one multi-symbol API request"""
+
+    def __init__(self, fetch: Callable[[List[str]], Awaitable[Dict[str, Dict]]],
+                 max_batch: int = 50, max_wait: float = 0.02):
+        self._fetch = fetch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def get(self, symbol: str) -> Optional[Dict]:
+        """Queue a symbol and wait for its slice of the next batched response"""
+        loop = asyncio.get_running_loop()
+        # The worker belongs to one event loop; start a fresh one for each new loop
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        self._queue.put_nowait((symbol, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while True:
+                # Block for the first request, then yield once so callers started alongside it can queue
+                batch = [await self._queue.get()]
+                await asyncio.sleep(0)
+
+                # A lone caller is flushed at once; otherwise gather more until the batch fills or the window closes
+                if not self._queue.empty():
+                    deadline = loop.time() + self.max_wait
+                    while len(batch) < self.max_batch:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                        except asyncio.TimeoutError:
+                            break
+
+                symbols = list(dict.fromkeys(symbol for symbol, _ in batch))
+                try:
+                    results = await self._fetch(symbols)
+                except Exception as e:
+                    logger.error(f"Batched request for {len(symbols)} symbols failed: {e}")
+                    results = {}
+
+                for symbol, future in batch:
+                    if not future.done():
+                        future.set_result(results.get(symbol))
+                batch = []
+        finally:
+            # Callers still waiting when the worker stops get a cancelled future instead of hanging
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            for _, future in batch:
+                future.cancel()
+
+    def close(self) -> None:
+        """Stop the worker task"""
+        worker, loop = self._worker, self._loop
+        self._worker = None
+        if worker is not None and not worker.done() and not loop.is_closed():
+            loop.call_soon_threadsafe(worker.cancel)
+
 
 class EnhancedFyersService(FyersService):
     """Enhanced Fyers service with Level II data and order flow analysis"""
@@ -54,7 +248,7 @@ class EnhancedFyersService(FyersService):
     def __init__(self, config: FyersConfig):
         super().__init__(config)
 
-        # Level II data caching
+        # Level II data caching, keyed by symbol
         self.order_book_cache = {}
         self.tick_data_cache = {}
         self.last_update_times = {}
@@ -63,39 +257,119 @@ class EnhancedFyersService(FyersService):
         self.order_flow_history = {}
         self.imbalance_history = {}
 
+        # Concurrent per-symbol depth/quote lookups share one HTTP round trip
+        self._depth_batcher = _RequestBatcher(self._fetch_depth)
+        self._quote_batcher = _RequestBatcher(self._fetch_quotes)
+
+        # Streaming Level II state, kept current by the depth feed once it is running
+        self.depth_feed: Optional[FyersTickFeed] = None
+        self.tick_history: Dict[str, deque] = {}
+        self._ws_depth: Dict[str, Dict] = {}
+        self._feed_update_ns: Dict[str, int] = {}  # time.monotonic_ns() of each symbol's last depth push
+        self._symbols_by_fyers = {fyers: symbol for symbol, fyers in self.symbol_mapping.items()}
+
+    def close(self):
+        """Stop the request batchers and release pooled HTTP connections"""
+        self._depth_batcher.close()
+        self._quote_batcher.close()
+        super().close()
+
+    def create_depth_feed(self, symbols) -> FyersTickFeed:
+        """Build the WebSocket feed that keeps order_book_cache and tick_history current"""
+        self.depth_feed = FyersTickFeed(
+            self.config,
+            (self.symbol_mapping.get(s, s) for s in symbols),
+            data_types=("DepthUpdate", "SymbolUpdate"),
+            litemode=False,
+            on_message=self._on_feed_message
+        )
+        return self.depth_feed
+
+    def _on_feed_message(self, message: Dict) -> None:
+        """Fold a depth or trade push into the in-memory book (runs on the event loop thread)"""
+        fyers_symbol = message.get('symbol')
+        if not fyers_symbol:
+            return
+        symbol = self._symbols_by_fyers.get(fyers_symbol, fyers_symbol)
+
+        # Depth pushes may carry only the changed fields, so merge into the last known state
+        state = self._ws_depth.setdefault(symbol, {})
+        state.update(message)
+
+        if message.get('type') == 'dp':
+            self.order_book_cache[symbol] = self._parse_order_book(symbol, {
+                'bids': [{'price': state.get(f'bid_price{i}', 0), 'volume': state.get(f'bid_size{i}', 0),
+                          'orders': state.get(f'bid_order{i}', 1)} for i in range(1, DEPTH_LEVELS + 1)
+                         if state.get(f'bid_price{i}')],
+                'asks': [{'price': state.get(f'ask_price{i}', 0), 'volume': state.get(f'ask_size{i}', 0),
+                          'orders': state.get(f'ask_order{i}', 1)} for i in range(1, DEPTH_LEVELS + 1)
+                         if state.get(f'ask_price{i}')],
+                'ltp': state.get('ltp', 0),
+                'ltq': state.get('last_traded_qty', 0)
+            })
+            self._feed_update_ns[symbol] = time.monotonic_ns()
+        elif 'ltp' in message:
+            # Classify the trade against the last known mid price
+            book = self.order_book_cache.get(symbol)
+            price = float(message['ltp'])
+            history = self.tick_history.get(symbol)
+            if history is None:
+                history = self.tick_history[symbol] = deque(maxlen=TICK_HISTORY_SIZE)
+            history.append(TickData(
+                symbol=symbol,
+                timestamp_ns=time.time_ns(),
+                price=price,
+                quantity=int(message.get('last_traded_qty', 0)),
+                side='BUY' if book is None or price >= book.mid_price else 'SELL'
+            ))
+
+    async def _fetch_depth(self, fyers_symbols: List[str]) -> Dict[str, Dict]:
+        """Market depth for several symbols in one request, keyed by Fyers symbol"""
+        result = await asyncio.to_thread(self._make_request, 'GET', '/data/depth', {
+            'symbol': ','.join(fyers_symbols),
+            'ohlcv_flag': '1'
+        })
+        return (result or {}).get('d') or {}
+
+    async def _fetch_quotes(self, fyers_symbols: List[str]) -> Dict[str, Dict]:
+        """Quotes for several symbols in one request, keyed by Fyers symbol"""
+        result = await asyncio.to_thread(self._make_request, 'GET', '/data/quotes', {
+            'symbols': ','.join(fyers_symbols),
+            'ohlcv_flag': '1'
+        })
+        return {item.get('n'): item['v'] for item in (result or {}).get('d', []) if 'v' in item}
+
     async def get_market_depth(self, symbol: str) -> Optional[OrderBookSnapshot]:
         """Get Level II market depth data"""
         try:
-            fyers_symbol = self.symbol_mapping.get(symbol, symbol)
+            # Check cache freshness on the monotonic clock (an int compare, no timedelta)
+            now_ns = time.monotonic_ns()
 
-            # Check cache freshness (Level II data should be very fresh)
-            cache_key = f"depth_{symbol}"
-            now = datetime.now()
+            # Books pushed by the depth feed are served while recent; a dropped or silent socket
+            # leaves them to age out, and the book is then polled over REST like any other
+            pushed_ns = self._feed_update_ns.get(symbol)
+            if pushed_ns is not None and now_ns - pushed_ns < FEED_BOOK_MAX_AGE_NS:
+                return self.order_book_cache[symbol]
 
-            if (cache_key in self.last_update_times and
-                    (now - self.last_update_times[cache_key]).total_seconds() < 1.0):
-                return self.order_book_cache.get(cache_key)
+            fyers_symbol = self.symbol_mapping.get(symbol, symbol)
 
-            # Fetch market depth from Fyers API
-            depth_data = self._make_request('GET', '/data/depth', {
-                'symbol': fyers_symbol,
-                'ohlcv_flag': '1'
-            })
+            last_ns = self.last_update_times.get(symbol)
+            if last_ns is not None and now_ns - last_ns < DEPTH_CACHE_TTL_NS:
+                return self.order_book_cache.get(symbol)
 
-            depth_data = depth_data["d"]
+            # Concurrent lookups are coalesced into one depth request by the batcher
+            market_depth = await self._depth_batcher.get(fyers_symbol)
 
-            if not depth_data or fyers_symbol not in depth_data:
+            if not market_depth:
                 logger.warning(f"No market depth data for {symbol}")
                 return None
 
-            market_depth = depth_data[fyers_symbol]
-
             # Parse and create order book snapshot
             order_book = self._parse_order_book(symbol, market_depth)
 
             # Cache the result
-            self.order_book_cache[cache_key] = order_book
-            self.last_update_times[cache_key] = now
+            self.order_book_cache[symbol] = order_book
+            self.last_update_times[symbol] = now_ns
 
             return order_book
 
@@ -105,42 +379,20 @@ class EnhancedFyersService(FyersService):
 
     def _parse_order_book(self, symbol: str, market_depth: Dict) -> OrderBookSnapshot:
         """Parse Fyers market depth response into OrderBookSnapshot"""
-
-        # Parse bid levels
-        bids = []
-        if 'bids' in market_depth:
-            for bid_data in market_depth['bids']:
-                bids.append(OrderBookLevel(
-                    price=float(bid_data.get('price', 0)),
-                    quantity=int(bid_data.get('volume', 0)),
-                    orders=int(bid_data.get('orders', 1)),
-                    side='BID'
-                ))
-
-        # Parse ask levels
-        asks = []
-        if 'asks' in market_depth:
-            for ask_data in market_depth['asks']:
-                asks.append(OrderBookLevel(
-                    price=float(ask_data.get('price', 0)),
-                    quantity=int(ask_data.get('volume', 0)),
-                    orders=int(ask_data.get('orders', 1)),
-                    side='ASK'
-                ))
-
         # Sort bids (highest first) and asks (lowest first)
-        bids = sorted(bids, key=lambda x: x.price, reverse=True)
-        asks = sorted(asks, key=lambda x: x.price)
+        bids = parse_book_levels(market_depth.get('bids', ()), descending=True)
+        # The REST depth response names the ask side 'ask'; feed-built books use 'asks'
+        asks = parse_book_levels(market_depth.get('asks') or market_depth.get('ask', ()), descending=False)
 
         # Calculate spread and mid-price
-        best_bid = bids[0].price if bids else 0
-        best_ask = asks[0].price if asks else 0
+        best_bid = float(bids['price'][0]) if bids.size else 0
+        best_ask = float(asks['price'][0]) if asks.size else 0
         spread = best_ask - best_bid if best_bid > 0 and best_ask > 0 else 0
         mid_price = (best_bid + best_ask) / 2 if best_bid > 0 and best_ask > 0 else 0
 
         return OrderBookSnapshot(
             symbol=symbol,
-            timestamp=datetime.now(),
+            timestamp_ns=time.time_ns(),
             bids=bids,
             asks=asks,
             last_traded_price=float(market_depth.get('ltp', 0)),
@@ -152,34 +404,40 @@ class EnhancedFyersService(FyersService):
     async def get_tick_data(self, symbol: str, duration_seconds: int = 10) -> List[TickData]:
         """Get recent tick data for order flow analysis"""
         try:
-            # In a real implementation, this would connect to tick data stream
-            # For now, we'll simulate tick data based on recent quotes
-
+            # Real trades from the depth feed when it has seen any for this symbol
+            history = self.tick_history.get(symbol)
+            if history:
+                # The history is in arrival order, so walk back only as far as the window reaches
+                cutoff_ns = time.time_ns() - duration_seconds * NS_PER_SECOND
+                recent = []
+                for tick in reversed(history):
+                    if tick.timestamp_ns < cutoff_ns:
+                        break
+                    recent.append(tick)
+                recent.reverse()
+                return recent
+
+            # Without the feed, simulate tick data based on recent quotes
             fyers_symbol = self.symbol_mapping.get(symbol, symbol)
 
-            # Get recent quotes to simulate tick data
-            quotes_data = self._make_request('POST', '/data/quotes', {
-                'symbols': fyers_symbol,
-                'ohlcv_flag': '1'
-            })
+            # Get recent quotes to simulate tick data (batched with concurrent lookups)
+            quote = await self._quote_batcher.get(fyers_symbol)
 
-            if not quotes_data or fyers_symbol not in quotes_data:
+            if not quote:
                 return []
 
-            quote = quotes_data[fyers_symbol]
-
             # Simulate tick data (in real implementation, this would be actual ticks)
             ticks = []
-            base_time = datetime.now()
+            base_ns = time.time_ns()
 
             for i in range(duration_seconds):
                 # Simulate price movement around last traded price
-                base_price = float(quote.get('ltp', 0))
+                base_price = float(quote.get('lp', 0))
                 price_variation = base_price * 0.001  # 0.1% variation
 
                 tick = TickData(
                     symbol=symbol,
-                    timestamp=base_time - timedelta(seconds=duration_seconds - i),
+                    timestamp_ns=base_ns - (duration_seconds - i) * NS_PER_SECOND,
                     price=base_price + (i % 3 - 1) * price_variation,
                     quantity=100 + (i * 50),
                     side='BUY' if i % 2 == 0 else 'SELL'
@@ -197,8 +455,9 @@ class EnhancedFyersService(FyersService):
         if not ticks:
             return {'buy_volume': 0, 'sell_volume': 0, 'imbalance_ratio': 1.0}
 
-        buy_volume = sum(tick.quantity for tick in ticks if tick.side == 'BUY')
-        sell_volume = sum(tick.quantity for tick in ticks if tick.side == 'SELL')
+        quantities = np.fromiter((tick.quantity for tick in ticks), dtype=np.int64, count=len(ticks))
+        sides = np.fromiter((SIDE_CODES.get(tick.side, -1) for tick in ticks), dtype=np.int8, count=len(ticks))
+        buy_volume, sell_volume = (int(v) for v in _side_volumes(quantities, sides))
 
         total_volume = buy_volume + sell_volume
         if total_volume == 0:
@@ -218,16 +477,12 @@ class EnhancedFyersService(FyersService):
     def analyze_order_book_imbalance(self, order_book: OrderBookSnapshot,
                                      levels: int = 3) -> Dict[str, float]:
         """Analyze bid/ask imbalance in order book"""
-        if not order_book.bids or not order_book.asks:
+        if order_book.bid_sizes.size == 0 or order_book.ask_sizes.size == 0:
             return {'bid_volume': 0, 'ask_volume': 0, 'imbalance_ratio': 1.0}
 
         # Sum volumes at top levels
-        bid_volume = sum(
-            level.quantity for level in order_book.bids[:levels]
-        )
-        ask_volume = sum(
-            level.quantity for level in order_book.asks[:levels]
-        )
+        bid_volume = int(order_book.bid_sizes[:levels].sum())
+        ask_volume = int(order_book.ask_sizes[:levels].sum())
 
         total_volume = bid_volume + ask_volume
         if total_volume == 0:
@@ -248,18 +503,9 @@ class EnhancedFyersService(FyersService):
     def identify_support_resistance_levels(self, order_book: OrderBookSnapshot,
                                            min_volume_threshold: int = 1000) -> Dict[str, List[float]]:
         """Identify support and resistance levels from order book"""
-        support_levels = []
-        resistance_levels = []
-
-        # Identify significant bid levels (support)
-        for level in order_book.bids:
-            if level.quantity >= min_volume_threshold:
-                support_levels.append(level.price)
-
-        # Identify significant ask levels (resistance)
-        for level in order_book.asks:
-            if level.quantity >= min_volume_threshold:
-                resistance_levels.append(level.price)
+        # Significant bid levels are support, significant ask levels are resistance
+        support_levels = order_book.bid_prices[order_book.bid_sizes >= min_volume_threshold].tolist()
+        resistance_levels = order_book.ask_prices[order_book.ask_sizes >= min_volume_threshold].tolist()
 
         return {
             'support_levels': support_levels[:5],  # Top 5 support levels
@@ -277,64 +523,56 @@ class EnhancedFyersService(FyersService):
             if len(hist_data) < period_minutes:
                 return 0.0
 
-            # Calculate returns and volatility
-            recent_data = hist_data.tail(period_minutes)
-            returns = recent_data['Close'].pct_change().dropna()
+            close = np.ascontiguousarray(hist_data['Close'].to_numpy()[-period_minutes:], dtype=np.float64)
+            return float(_realized_vol(close))
 
-            if len(returns) == 0:
-                return 0.0
+        except Exception as e:
+            logger.error(f"Error calculating volatility for {symbol}: {e}")
+            return 0.0
 
-            # Annualized volatility
-            volatility = returns.std() * (252 ** 0.5) * 100  # Percentage
+    async def get_real_time_volatility_batch(self, symbols: List[str], period_minutes: int = 5) -> np.ndarray:
+        """Volatility for many symbols in one parallel kernel, aligned with symbols; 0.0 where data is short"""
+        closes = np.zeros((len(symbols), period_minutes), dtype=np.float64)
+        valid = np.zeros(len(symbols), dtype=np.bool_)
 
-            return volatility
+        for i, symbol in enumerate(symbols):
+            try:
+                hist_data = self.get_historical_data(symbol, "1d")
+                if len(hist_data) >= period_minutes:
+                    closes[i] = hist_data['Close'].to_numpy()[-period_minutes:]
+                    valid[i] = True
+            except Exception as e:
+                logger.error(f"Error loading volatility data for {symbol}: {e}")
 
+        try:
+            return _realized_vol_batch(closes, valid)
         except Exception as e:
-            logger.error(f"Error calculating volatility for {symbol}: {e}")
-            return 0.0
+            logger.error(f"Error calculating batch volatility: {e}")
+            return np.zeros(len(symbols))
 
     def check_scalping_conditions(self, order_book: OrderBookSnapshot,
                                   ticks: List[TickData]) -> Dict[str, bool]:
         """Check if market conditions are suitable for scalping"""
-        conditions = {
-            'adequate_spread': False,
-            'sufficient_volume': False,
-            'stable_book': False,
-            'good_imbalance': False,
-            'active_trading': False
-        }
-
         try:
-            # Check spread (not too wide, not too narrow)
-            if order_book.spread > 0:
-                spread_bps = (order_book.spread / order_book.mid_price) * 10000
-                conditions['adequate_spread'] = 5 <= spread_bps <= 50  # 0.5 to 5 bps
-
-            # Check volume at best levels
-            if order_book.bids and order_book.asks:
-                best_bid_vol = order_book.bids[0].quantity
-                best_ask_vol = order_book.asks[0].quantity
-                conditions['sufficient_volume'] = (best_bid_vol + best_ask_vol) >= 500
-
-            # Check order book stability (depth)
-            conditions['stable_book'] = len(order_book.bids) >= 3 and len(order_book.asks) >= 3
-
-            # Check imbalance
+            bid_sizes = order_book.bid_sizes
+            ask_sizes = order_book.ask_sizes
             imbalance = self.analyze_order_book_imbalance(order_book)
-            conditions['good_imbalance'] = (
-                    imbalance['imbalance_ratio'] >= 1.5 or
-                    imbalance['imbalance_ratio'] <= 0.67
-            )
-
-            # Check recent trading activity
-            if ticks:
-                recent_volume = sum(tick.quantity for tick in ticks[-10:])  # Last 10 ticks
-                conditions['active_trading'] = recent_volume >= 1000
 
+            mask = _scalping_mask(
+                float(order_book.spread),
+                float(order_book.mid_price),
+                int(bid_sizes[0]) if bid_sizes.size else 0,
+                int(ask_sizes[0]) if ask_sizes.size else 0,
+                bid_sizes.size,
+                ask_sizes.size,
+                float(imbalance['imbalance_ratio']),
+                sum(tick.quantity for tick in ticks[-10:])  # Last 10 ticks
+            )
         except Exception as e:
             logger.error(f"Error checking scalping conditions: {e}")
+            mask = 0
 
-        return conditions
+        return {key: bool(mask >> i & 1) for i, key in enumerate(SCALPING_CONDITION_KEYS)}
 
     async def place_scalping_order(self, symbol: str, side: str, quantity: int,
                                    order_type: str = "1", price: float = None) -> Optional[Dict]:
@@ -351,10 +589,10 @@ class EnhancedFyersService(FyersService):
             if price is None:
                 if side == '1':  # Buy order
                     # Use best ask price for immediate execution
-                    price = order_book.asks[0].price if order_book.asks else order_book.mid_price
+                    price = float(order_book.ask_prices[0]) if order_book.asks.size else order_book.mid_price
                 else:  # Sell order
                     # Use best bid price for immediate execution
-                    price = order_book.bids[0].price if order_book.bids else order_book.mid_price
+                    price = float(order_book.bid_prices[0]) if order_book.bids.size else order_book.mid_price
 
             # Place the order
             order_result = self.place_order(symbol, side, quantity, order_type, price)
@@ -30,12 +30,13 @@ class ImprovedScalpingTest:
         """Initialize the enhanced trading system with improved error handling"""
         try:
             # Authenticate first
-            if not authenticate_fyers_enhanced(self.config):
+            fyers_config = await authenticate_fyers_enhanced(self.config)
+            if not fyers_config:
                 logger.error("Authentication failed")
                 return False
 
             # Create enhanced Fyers service
-            self.enhanced_fyers = EnhancedFyersService(self.config['fyers'])
+            self.enhanced_fyers = EnhancedFyersService(fyers_config)
 
             logger.info("✓ Enhanced Fyers service initialized")
             return True
@@ -97,11 +98,11 @@ class ImprovedScalpingTest:
                     print(f"    - Mid Price: Rs.{order_book.mid_price:.2f}")
                     print(f"    - Last Price: Rs.{order_book.last_traded_price:.2f}")
 
-                    if order_book.bids and order_book.asks:
+                    if order_book.bids.size and order_book.asks.size:
                         best_bid = order_book.bids[0]
                         best_ask = order_book.asks[0]
-                        print(f"    - Best Bid: Rs.{best_bid.price:.2f} (Qty: {best_bid.quantity})")
-                        print(f"    - Best Ask: Rs.{best_ask.price:.2f} (Qty: {best_ask.quantity})")
+                        print(f"    - Best Bid: Rs.{best_bid['price']:.2f} (Qty: {best_bid['quantity']})")
+                        print(f"    - Best Ask: Rs.{best_ask['price']:.2f} (Qty: {best_ask['quantity']})")
 
                     # Test order book analysis
                     imbalance = self.enhanced_fyers.analyze_order_book_imbalance(order_book)
@@ -286,12 +287,13 @@ async def test_individual_components():
 
     config = load_enhanced_config()
 
-    if not authenticate_fyers_enhanced(config):
+    fyers_config = await authenticate_fyers_enhanced(config)
+    if not fyers_config:
         print("❌ Authentication failed")
         return
 
     # Test enhanced Fyers service independently
-    enhanced_fyers = EnhancedFyersService(config['fyers'])
+    enhanced_fyers = EnhancedFyersService(fyers_config)
 
     print("\n1. Testing Basic Quote Retrieval:")
     try:
@@ -1,27 +1,60 @@
+import asyncio
+import atexit
 import requests
+from requests.adapters import HTTPAdapter
 import hashlib
 import hmac
 import json
 import logging
+import sys
+import threading
+import numpy as np
 import pandas as pd
 import yfinance as yf
 from urllib.parse import urlencode
 
-from typing import Dict, List, Optional
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional
 from config.settings import FyersConfig
 from interfaces.data_provider import IDataProvider, IBroker
-from models.trading_models import MarketData
+from services.cache import FileCache, cache_historical_data
+from models.trading_models import QuoteFrame
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Daily history does not change intraday, so it is shared across cycles and restarts
+history_cache = FileCache()
+
+_session_lock = threading.Lock()
+_shared_session: Optional[requests.Session] = None
+
+
+def shared_session() -> requests.Session:
+    """Process-wide keep-alive session so every service instance reuses the same warm connections"""
+    global _shared_session
+    with _session_lock:
+        if _shared_session is None:
+            _shared_session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=64)
+            _shared_session.mount('https://', adapter)
+            _shared_session.mount('http://', adapter)
+            atexit.register(_shared_session.close)
+        return _shared_session
+
 
 class FyersService(IDataProvider, IBroker):
     """Fyers API implementation"""
 
-    def __init__(self, config: FyersConfig):
+    def __init__(self, config: FyersConfig, token_refresher: Optional[Callable[[], Optional[str]]] = None):
         self.config = config
-        self.session = requests.Session()
+
+        # Called on HTTP 401 to obtain a fresh access token without prompting; the request is then retried once
+        self.token_refresher = token_refresher
+        self._refresh_lock = threading.Lock()
+
+        # Pooled keep-alive session shared with every other service instance in the process
+        self.session = shared_session()
 
         # Symbol mapping
         self.symbol_mapping = {
@@ -55,6 +88,12 @@ class FyersService(IDataProvider, IBroker):
             'EICHERMOT.NS': 'NSE:EICHERMOT-EQ',
             'RELIANCE.NS': 'NSE:RELIANCE-EQ',
         }
+        # Interned once so per-call lookups and cache keys hash and compare by identity
+        self.symbol_mapping = {sys.intern(symbol): sys.intern(fyers_symbol)
+                               for symbol, fyers_symbol in self.symbol_mapping.items()}
+
+    def close(self):
+        """Nothing to release per instance; the shared session is closed at process exit"""
 
     def _log_request_details(self, method: str, url: str, headers: Dict, data: Dict = None, is_get: bool = False):
         """Log complete request details for debugging"""
@@ -149,16 +188,12 @@ class FyersService(IDataProvider, IBroker):
             else:
                 url = f"{self.config.base_url}{endpoint}"
 
-            headers = {'Authorization': f"{self.config.client_id}:{self.config.access_token}"}
+            token = self.config.access_token
+            response = self._send(method, url, token, data)
 
-            # Log request details before making the request
-            is_get_request = method.upper() == 'GET'
-            # self._log_request_details(method, url, headers, data, is_get_request)
-
-            if method.upper() == 'GET':
-                response = self.session.get(url, headers=headers, params=data)
-            else:
-                response = self.session.request(method, url, headers=headers, json=data)
+            # The token is used optimistically; refresh it and retry once if it has expired
+            if response.status_code == 401 and self._refresh_token_after(token):
+                response = self._send(method, url, self.config.access_token, data)
 
             # Log response details
             # self._log_response_details(response)
@@ -180,7 +215,38 @@ class FyersService(IDataProvider, IBroker):
             logger.error(f"Request failed: {e}")
             return None
 
-    async def get_quotes(self, symbols: List[str]) -> Dict[str, MarketData]:
+    def _send(self, method: str, url: str, access_token: str, data: Dict = None) -> requests.Response:
+        """Send one authenticated request"""
+        headers = {'Authorization': f"{self.config.client_id}:{access_token}"}
+
+        # Log request details before making the request
+        is_get_request = method.upper() == 'GET'
+        # self._log_request_details(method, url, headers, data, is_get_request)
+
+        if is_get_request:
+            return self.session.get(url, headers=headers, params=data)
+        return self.session.request(method, url, headers=headers, json=data)
+
+    def _refresh_token_after(self, rejected_token: str) -> bool:
+        """Replace a rejected access token, returning True if a retry is worthwhile"""
+        if self.token_refresher is None:
+            return False
+
+        with self._refresh_lock:
+            # Another request may already have refreshed it
+            if self.config.access_token != rejected_token:
+                return True
+
+            logger.warning("Access token rejected, refreshing...")
+            new_token = self.token_refresher()
+            if not new_token:
+                logger.error("Access token refresh failed")
+                return False
+
+            self.config = replace(self.config, access_token=new_token)
+            return True
+
+    async def get_quotes(self, symbols: List[str]) -> QuoteFrame:
         """Get real-time quotes"""
         try:
             fyers_symbols = [self.symbol_mapping.get(s, s) for s in symbols]
@@ -190,35 +256,44 @@ class FyersService(IDataProvider, IBroker):
                 'ohlcv_flag': '1'
             }
 
-            result = self._make_request('GET', '/data/quotes', data)
+            # Off the event loop: the request blocks, and a 401 also runs the token refresh
+            result = await asyncio.to_thread(self._make_request, 'GET', '/data/quotes', data)
 
             if not result:
-                return {}
-
-            market_data = {}
-            for symbol in symbols:
-                fyers_symbol = self.symbol_mapping.get(symbol, symbol)
-                matches = [item for item in result.get('d', []) if item.get('n') == fyers_symbol]
-                if len(matches) > 0:
-                # if fyers_symbol in result:
-                    quote = matches[0]['v']
-                    market_data[symbol] = MarketData(
-                        symbol=symbol,
-                        current_price=quote['lp'],
-                        open_price=quote['open_price'],
-                        high_price=quote['high_price'],
-                        low_price=quote['low_price'],
-                        volume=quote['volume'],
-                        previous_close=quote['prev_close_price'],
-                        timestamp=datetime.now()
-                    )
-
-            return market_data
+                return QuoteFrame()
+
+            # Index the response once instead of scanning it per symbol
+            quotes_by_name = {item.get('n'): item['v'] for item in result.get('d', []) if 'v' in item}
+
+            found = []
+            columns = []
+            for symbol, fyers_symbol in zip(symbols, fyers_symbols):
+                quote = quotes_by_name.get(fyers_symbol)
+                if quote is not None:
+                    found.append(symbol)
+                    columns.append((quote['lp'], quote['open_price'], quote['high_price'],
+                                    quote['low_price'], quote['volume'], quote['prev_close_price']))
+
+            if not found:
+                return QuoteFrame()
+
+            table = np.array(columns, dtype=np.float64)
+            return QuoteFrame(
+                symbols=tuple(found),
+                current_price=table[:, 0],
+                open_price=table[:, 1],
+                high_price=table[:, 2],
+                low_price=table[:, 3],
+                volume=table[:, 4].astype(np.int64),
+                previous_close=table[:, 5],
+                timestamp=datetime.now()
+            )
 
         except Exception as e:
             logger.error(f"Error fetching quotes: {e}")
-            return {}
+            return QuoteFrame()
 
+    @cache_historical_data(history_cache)
     def get_historical_data(self, symbol: str, period: str) -> pd.DataFrame:
         """Get historical data using yfinance as fallback"""
         try:
@@ -231,7 +306,7 @@ class FyersService(IDataProvider, IBroker):
     async def get_index_data(self, index_symbol: str = 'NSE:NIFTY50-INDEX') -> Dict:
         """Get index data"""
         try:
-            result = self._make_request('GET', '/data/quotes', {
+            result = await asyncio.to_thread(self._make_request, 'GET', '/data/quotes', {
                 'symbols': index_symbol,
                 'ohlcv_flag': '1'
             })
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config.settings import FyersConfig
+
+logger = logging.getLogger(__name__)
+
+FEED_STALE_SECONDS = 60  # Tick silence during market hours that triggers a feed reconnect
+
+
+class FyersTickFeed:
+    """Fyers WebSocket market data feed that hands ticks to the event loop through an asyncio.Queue"""
+
+    def __init__(self, config: FyersConfig, symbols: Iterable[str], max_queue_size: int = 1000,
+                 data_types: Tuple[str, ...] = ("SymbolUpdate",), litemode: bool = True,
+                 on_message: Optional[Callable[[Dict], None]] = None):
+        self.config = config
+        self.symbols: List[str] = list(symbols)
+        self.data_types = data_types
+        self.litemode = litemode
+        self.on_message = on_message  # Called on the loop thread for every message, before it is queued
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.tick_event = asyncio.Event()  # Set on every tick; consumers clear it once they have reacted
+        self.last_tick_time: Optional[float] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._socket = None
+
+    async def start(self, config: Optional[FyersConfig] = None) -> bool:
+        """Connect the WebSocket and subscribe to symbol updates, switching to config's token when given"""
+        if config is not None:
+            self.config = config
+
+        try:
+            from fyers_apiv3.FyersWebsocket import data_ws
+        except ImportError as e:
+            logger.error(f"Fyers WebSocket client not available: {e}")
+            return False
+
+        self._loop = asyncio.get_running_loop()
+
+        try:
+            self._socket = data_ws.FyersDataSocket(
+                access_token=f"{self.config.client_id}:{self.config.access_token}",
+                log_path="",
+                litemode=self.litemode,
+                write_to_file=False,
+                reconnect=True,
+                on_connect=self._on_connect,
+                on_close=self._on_close,
+                on_error=self._on_error,
+                on_message=self._on_message
+            )
+            # connect() performs the blocking handshake, so keep it off the event loop
+            await asyncio.to_thread(self._socket.connect)
+            logger.info(f"Market feed connected for {len(self.symbols)} symbols")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to start market feed: {e}")
+            self._socket = None
+            return False
+
+    def stop(self) -> None:
+        """Close the WebSocket connection"""
+        if self._socket is not None:
+            try:
+                self._socket.close_connection()
+            except Exception as e:
+                logger.error(f"Error closing market feed: {e}")
+            self._socket = None
+
+    @property
+    def connected(self) -> bool:
+        return self._socket is not None
+
+    def seconds_since_last_tick(self) -> Optional[float]:
+        """Age of the newest tick, or None if nothing has arrived yet"""
+        if self.last_tick_time is None:
+            return None
+        return time.monotonic() - self.last_tick_time
+
+    async def get(self) -> Dict:
+        """Wait for the next tick"""
+        return await self.queue.get()
+
+    def drain(self) -> int:
+        """Discard queued ticks, returning how many were dropped"""
+        dropped = 0
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            dropped += 1
+        return dropped
+
+    # Callbacks below run on the WebSocket client's thread
+
+    def _on_connect(self):
+        for data_type in self.data_types:
+            self._socket.subscribe(symbols=self.symbols, data_type=data_type)
+
+    def _on_message(self, message: Dict):
+        self._loop.call_soon_threadsafe(self._enqueue, message)
+
+    def _on_error(self, message):
+        logger.error(f"Market feed error: {message}")
+
+    def _on_close(self, message):
+        logger.warning(f"Market feed closed: {message}")
+
+    def _enqueue(self, message: Dict) -> None:
+        """Queue a tick on the loop thread, dropping the oldest one when full"""
+        self.last_tick_time = time.monotonic()
+        if self.on_message is not None:
+            try:
+                self.on_message(message)
+            except Exception as e:
+                logger.error(f"Error handling market feed message: {e}")
+        self.tick_event.set()
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
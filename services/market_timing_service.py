@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from config.settings import TradingConfig
 import logging
 import pytz
@@ -54,4 +54,60 @@ class MarketTimingService:
             microsecond=0
         )
 
-        return market_start <= now <= signal_end
\ No newline at end of file
+        return market_start <= now <= signal_end
+
+    def seconds_until_market_open(self) -> float:
+        """Seconds until the next market open (0 while trading)"""
+        if self.is_trading_time():
+            return 0.0
+
+        now = datetime.now(IST)
+        market_open = now.replace(
+            hour=self.config.market_start_hour,
+            minute=self.config.market_start_minute,
+            second=0,
+            microsecond=0
+        )
+
+        if now >= market_open:
+            market_open += timedelta(days=1)
+        while market_open.weekday() >= 5:
+            market_open += timedelta(days=1)
+
+        return (market_open - now).total_seconds()
+
+    def seconds_until_market_close(self) -> float:
+        """Seconds until today's market close (0 outside trading hours)"""
+        if not self.is_trading_time():
+            return 0.0
+
+        now = datetime.now(IST)
+        market_end = now.replace(
+            hour=self.config.market_end_hour,
+            minute=self.config.market_end_minute,
+            second=0,
+            microsecond=0
+        )
+
+        return max((market_end - now).total_seconds(), 0.0)
+
+    def seconds_until_next_event(self) -> float:
+        """Seconds until the next market open, signal-window end or market close"""
+        now = datetime.now(IST)
+
+        if now.weekday() < 5:
+            upcoming = [
+                event for event in (
+                    now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+                    for hour, minute in (
+                        (self.config.market_start_hour, self.config.market_start_minute),
+                        (self.config.signal_generation_end_hour, self.config.signal_generation_end_minute),
+                        (self.config.market_end_hour, self.config.market_end_minute)
+                    )
+                )
+                if event > now
+            ]
+            if upcoming:
+                return (min(upcoming) - now).total_seconds()
+
+        return self.seconds_until_market_open()
\ No newline at end of file
@@ -1,10 +1,12 @@
 from typing import Dict, List
 import logging
+import numpy as np
 from interfaces.data_provider import IBroker
 from interfaces.data_provider import IDataProvider
 from models.trading_models import TradingSignal
 from models.trading_models import Position
 from models.trading_models import PnLSummary
+from models.trading_models import PositionBook
 from config.settings import StrategyConfig
 from typing import Optional
 
@@ -59,7 +61,7 @@ class PositionManagementService:
             logger.error(f"Error executing trade for {signal.symbol}: {e}")
             return None
 
-    def monitor_positions(self, positions: Dict[str, Position]) -> PnLSummary:
+    def monitor_positions(self, positions: PositionBook) -> PnLSummary:
         """Monitor and update positions"""
         pnl_summary = PnLSummary()
 
@@ -67,18 +69,22 @@ class PositionManagementService:
             broker_positions = self.broker.get_positions()
             current_orders = self.broker.get_orders()
 
+            # Open positions are priced straight from the book's columns
+            slots = positions.open_slots()
+            current_prices = np.full(len(slots), np.nan)
+
             closed_positions = []
 
-            for symbol, position in positions.items():
+            for i, slot in enumerate(slots):
+                position = positions.position_at(slot)
+                symbol = position.symbol
                 try:
                     # Find position in broker data
                     broker_position = self._find_broker_position(symbol, broker_positions)
 
                     if broker_position:
                         # Position still active
-                        current_price = float(broker_position['ltp'])
-                        unrealized_pnl = (position.entry_price - current_price) * position.quantity
-                        pnl_summary.unrealized_pnl += unrealized_pnl
+                        current_prices[i] = float(broker_position['ltp'])
 
                     else:
                         # Position closed
@@ -96,6 +102,12 @@ class PositionManagementService:
                 except Exception as e:
                     logger.error(f"Error monitoring position {symbol}: {e}")
 
+            # Unrealized PnL for every priced position in one pass over the columns
+            priced = ~np.isnan(current_prices)
+            open_slots = slots[priced]
+            pnl_summary.unrealized_pnl = float(np.dot(
+                positions.entry_prices[open_slots] - current_prices[priced], positions.quantities[open_slots]))
+
             # Update closed positions list
             for symbol in closed_positions:
                 if symbol in positions:
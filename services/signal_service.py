@@ -1,9 +1,10 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+import numpy as np
 from datetime import datetime
 from config.settings import Sector, StrategyConfig
 from models.trading_models import TradingSignal
 from interfaces.data_provider import IDataProvider
-from services.analysis_service import TechnicalAnalysisService
+from services.analysis_service import TechnicalAnalysisService, market_hours_elapsed_now
 
 import logging
 
@@ -58,8 +59,9 @@ class SignalGenerationService:
             'EICHERMOT.NS': Sector.AUTO,
         }
 
-    async def generate_signals(self, index_data: Dict, config: StrategyConfig) -> List[TradingSignal]:
-        """Generate trading signals"""
+    async def generate_signals(self, index_data: Dict, config: StrategyConfig,
+                               market_hours_elapsed: Optional[float] = None) -> List[TradingSignal]:
+        """Generate trading signals; market_hours_elapsed is shared by every symbol in the cycle"""
         signals = []
 
         if index_data['gap_percentage'] <= 0:
@@ -70,25 +72,29 @@ class SignalGenerationService:
 
         # Get market data for all stocks
         symbols = list(self.stock_sectors.keys())
-        market_data_dict = await self.data_provider.get_quotes(symbols)
+        quotes = await self.data_provider.get_quotes(symbols)
 
-        for symbol, sector in self.stock_sectors.items():
-            try:
-                if symbol not in market_data_dict:
-                    continue
+        # Check gap-up condition for all symbols at once
+        gaps = quotes.gap_percentage
+        candidates = np.flatnonzero(gaps >= config.min_gap_percentage)
 
-                market_data = market_data_dict[symbol]
+        if market_hours_elapsed is None:
+            market_hours_elapsed = market_hours_elapsed_now()
 
-                # Check gap-up condition
-                gap_percentage = ((market_data.open_price - market_data.previous_close) /
-                                  market_data.previous_close) * 100
+        # Score selling pressure for every candidate in one batch
+        pressures = self.analysis_service.calculate_selling_pressure_batch(
+            [quotes.symbols[i] for i in candidates]
+        )
 
-                if gap_percentage < config.min_gap_percentage:
-                    continue
+        for i, selling_pressure in zip(candidates, pressures.tolist()):
+            symbol = quotes.symbols[i]
+            try:
+                sector = self.stock_sectors[symbol]
+                market_data = quotes.row(i)
+                gap_percentage = float(gaps[i])
 
                 # Calculate indicators
-                selling_pressure = self.analysis_service.calculate_selling_pressure_score(symbol)
-                volume_ratio = await self.analysis_service.calculate_volume_ratio(symbol, market_data)
+                volume_ratio = await self.analysis_service.calculate_volume_ratio(symbol, market_data, market_hours_elapsed)
 
                 # Check criteria
                 if (selling_pressure >= config.min_selling_pressure and
@@ -10,8 +10,9 @@ from enum import Enum
 import numpy as np
 
 from config.settings import Sector, StrategyConfig, TradingConfig
-from models.trading_models import TradingSignal, Position, MarketData
+from models.trading_models import TradingSignal, Position, PositionBook, MarketData
 from services.fyers_service import FyersService
+from services.enhanced_fyers_service import parse_book_levels
 from services.position_service import PositionManagementService
 from services.market_timing_service import MarketTimingService
 
@@ -53,22 +54,13 @@ class ScalpingConfig:
     min_confidence: float = 0.75  # Higher confidence threshold for scalping
 
 
-@dataclass
-class OrderBookLevel:
-    """Represents a level in the order book"""
-    price: float
-    quantity: int
-    orders: int
-    side: str  # 'BID' or 'ASK'
-
-
-@dataclass
+@dataclass(slots=True)
 class OrderBookSnapshot:
     """Complete order book snapshot"""
     symbol: str
     timestamp: datetime
-    bids: List[OrderBookLevel]
-    asks: List[OrderBookLevel]
+    bids: np.ndarray  # BOOK_LEVEL_DTYPE structured array, highest bid first
+    asks: np.ndarray  # BOOK_LEVEL_DTYPE structured array, lowest ask first
     last_traded_price: float
     last_traded_quantity: int
 
@@ -83,6 +75,21 @@ class Level2DataService:
     async def get_order_book(self, symbol: str) -> Optional[OrderBookSnapshot]:
         """Get Level II order book data"""
         try:
+            # The enhanced service serves books pushed by its depth feed and polls (batched) only when stale
+            get_market_depth = getattr(self.fyers_service, 'get_market_depth', None)
+            if get_market_depth is not None:
+                book = await get_market_depth(symbol)
+                if book is None:
+                    return None
+                return OrderBookSnapshot(
+                    symbol=symbol,
+                    timestamp=datetime.fromtimestamp(book.timestamp_ns / 1e9, IST),
+                    bids=book.bids,
+                    asks=book.asks,
+                    last_traded_price=book.last_traded_price,
+                    last_traded_quantity=book.last_traded_quantity
+                )
+
             # Using Fyers market depth API
             fyers_symbol = self.fyers_service.symbol_mapping.get(symbol, symbol)
 
@@ -96,33 +103,11 @@ class Level2DataService:
 
             market_depth = depth_data['d'][fyers_symbol]
 
-            # Parse bid data
-            bids = []
-            if 'bids' in market_depth:
-                for i, bid in enumerate(market_depth['bids']):
-                    bids.append(OrderBookLevel(
-                        price=bid['price'],
-                        quantity=bid['volume'],
-                        orders=bid.get('orders', 1),
-                        side='BID'
-                    ))
-
-            # Parse ask data
-            asks = []
-            if 'ask' in market_depth:
-                for i, ask in enumerate(market_depth['ask']):
-                    asks.append(OrderBookLevel(
-                        price=ask['price'],
-                        quantity=ask['volume'],
-                        orders=ask.get('orders', 1),
-                        side='ASK'
-                    ))
-
             return OrderBookSnapshot(
                 symbol=symbol,
                 timestamp=datetime.now(IST),
-                bids=sorted(bids, key=lambda x: x.price, reverse=True),  # Highest bid first
-                asks=sorted(asks, key=lambda x: x.price),  # Lowest ask first
+                bids=parse_book_levels(market_depth.get('bids', ()), descending=True),
+                asks=parse_book_levels(market_depth.get('ask', ()), descending=False),
                 last_traded_price=market_depth.get('ltp', 0),
                 last_traded_quantity=market_depth.get('ltq', 0)
             )
@@ -133,12 +118,12 @@ class Level2DataService:
 
     def calculate_bid_ask_imbalance(self, order_book: OrderBookSnapshot) -> float:
         """Calculate bid/ask volume imbalance ratio"""
-        if not order_book.bids or not order_book.asks:
+        if not order_book.bids.size or not order_book.asks.size:
             return 1.0
 
         # Sum volumes at best levels
-        total_bid_volume = sum(level.quantity for level in order_book.bids[:3])
-        total_ask_volume = sum(level.quantity for level in order_book.asks[:3])
+        total_bid_volume = int(order_book.bids['quantity'][:3].sum())
+        total_ask_volume = int(order_book.asks['quantity'][:3].sum())
 
         if total_ask_volume == 0:
             return float('inf')
@@ -148,18 +133,11 @@ class Level2DataService:
     def identify_support_resistance_levels(self, order_book: OrderBookSnapshot,
                                            config: ScalpingConfig) -> Dict[str, List[float]]:
         """Identify key support and resistance levels from order book"""
-        support_levels = []
-        resistance_levels = []
+        bids, asks = order_book.bids, order_book.asks
 
-        # Look for significant bid accumulation (support)
-        for level in order_book.bids:
-            if level.quantity >= config.min_volume_at_level:
-                support_levels.append(level.price)
-
-        # Look for significant ask accumulation (resistance)
-        for level in order_book.asks:
-            if level.quantity >= config.min_volume_at_level:
-                resistance_levels.append(level.price)
+        # Significant bid accumulation is support, significant ask accumulation is resistance
+        support_levels = bids['price'][bids['quantity'] >= config.min_volume_at_level].tolist()
+        resistance_levels = asks['price'][asks['quantity'] >= config.min_volume_at_level].tolist()
 
         return {
             'support': support_levels[:3],  # Top 3 support levels
@@ -262,11 +240,11 @@ class Level2ScalpingSignalService:
     def _check_spread_constraints(self, order_book: OrderBookSnapshot,
                                   config: ScalpingConfig) -> bool:
         """Check if spread is within acceptable range for scalping"""
-        if not order_book.bids or not order_book.asks:
+        if not order_book.bids.size or not order_book.asks.size:
             return False
 
-        best_bid = order_book.bids[0].price
-        best_ask = order_book.asks[0].price
+        best_bid = float(order_book.bids['price'][0])
+        best_ask = float(order_book.asks['price'][0])
 
         spread_ticks = int((best_ask - best_bid) * 100)  # Assuming 0.01 tick size
 
@@ -383,8 +361,8 @@ class Level2ScalpingSignalService:
         confidence += imbalance_score
 
         # Volume at best levels score
-        best_bid_volume = order_book.bids[0].quantity if order_book.bids else 0
-        best_ask_volume = order_book.asks[0].quantity if order_book.asks else 0
+        best_bid_volume = int(order_book.bids['quantity'][0]) if order_book.bids.size else 0
+        best_ask_volume = int(order_book.asks['quantity'][0]) if order_book.asks.size else 0
         total_volume = best_bid_volume + best_ask_volume
 
         volume_score = min(total_volume / (config.min_volume_at_level * 2), 1.0) * 0.25
@@ -422,12 +400,17 @@ class Level2ScalpingStrategy:
         self.scalping_config = scalping_config
 
         # State
-        self.positions: Dict[str, Position] = {}
+        self.positions = PositionBook(scalping_config.max_positions)  # Columnar, priced in one pass
         self.position_entry_times: Dict[str, datetime] = {}
         self.daily_pnl = 0.0
         self.total_pnl = 0.0
         self.trades_today = 0
 
+    @property
+    def active_position_count(self) -> int:
+        """Number of open positions"""
+        return len(self.positions)
+
     def is_scalping_time(self) -> bool:
         """Check if it's appropriate time for scalping"""
         now = datetime.now(IST)
@@ -463,7 +446,7 @@ class Level2ScalpingStrategy:
 
             # Generate new signals if in scalping time and have available slots
             if (self.is_scalping_time() and
-                    len(self.positions) < self.scalping_config.max_positions):
+                    self.active_position_count < self.scalping_config.max_positions):
                 await self._generate_and_execute_scalping_signals()
 
             # Log current status
@@ -629,7 +612,7 @@ class Level2ScalpingStrategy:
             )
             avg_hold_time = total_hold_time / len(self.position_entry_times)
 
-        logger.info(f"Scalping Strategy - Active: {len(self.positions)}, "
+        logger.info(f"Scalping Strategy - Active: {self.active_position_count}, "
                     f"Today's Trades: {self.trades_today}, "
                     f"Daily PnL: Rs.{self.daily_pnl:.2f}, "
                     f"Avg Hold: {avg_hold_time:.1f}s, "
@@ -658,7 +641,7 @@ class Level2ScalpingStrategy:
             'strategy_name': 'Level II Scalping',
             'total_pnl': self.total_pnl,
             'daily_pnl': self.daily_pnl,
-            'active_positions': len(self.positions),
+            'active_positions': self.active_position_count,
             'trades_today': self.trades_today,
             'positions_detail': active_positions_detail
         }
\ No newline at end of file
@@ -5,7 +5,7 @@ from typing import Dict, List
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from config.settings import Sector, StrategyConfig, TradingConfig
-from models.trading_models import TradingSignal, Position, MarketData
+from models.trading_models import TradingSignal, Position, PositionBook, MarketData
 from services.fyers_service import FyersService
 from services.analysis_service import TechnicalAnalysisService
 from services.position_service import PositionManagementService
@@ -272,10 +272,15 @@ class OpenBreakoutStrategy:
         self.breakout_config = breakout_config
 
         # State
-        self.positions: Dict[str, Position] = {}
+        self.positions = PositionBook(breakout_config.max_positions_per_strategy)  # Columnar, priced in one pass
         self.daily_pnl = 0.0
         self.total_pnl = 0.0
 
+    @property
+    def active_position_count(self) -> int:
+        """Number of open positions"""
+        return len(self.positions)
+
     def is_breakout_time(self) -> bool:
         """Check if it's time to look for breakouts (after opening range formation)"""
         now = datetime.now(IST)
@@ -324,7 +329,7 @@ class OpenBreakoutStrategy:
         try:
             # Check available position slots
             available_slots = (self.breakout_config.max_positions_per_strategy -
-                               len(self.positions))
+                               self.active_position_count)
 
             if available_slots <= 0:
                 return
@@ -417,7 +422,7 @@ class OpenBreakoutStrategy:
 
     def _log_breakout_status(self, unrealized_pnl: float) -> None:
         """Log current breakout strategy status"""
-        logger.info(f"Breakout Strategy - Active Positions: {len(self.positions)}, "
+        logger.info(f"Breakout Strategy - Active Positions: {self.active_position_count}, "
                     f"Daily PnL: Rs.{self.daily_pnl:.2f}, "
                     f"Total PnL: Rs.{self.total_pnl:.2f}, "
                     f"Unrealized: Rs.{unrealized_pnl:.2f}")
@@ -428,7 +433,7 @@ class OpenBreakoutStrategy:
             'strategy_name': 'Open Breakout',
             'total_pnl': self.total_pnl,
             'daily_pnl': self.daily_pnl,
-            'active_positions': len(self.positions),
+            'active_positions': self.active_position_count,
             'positions_detail': [
                 {
                     'symbol': pos.symbol,
@@ -0,0 +1,90 @@
+# tests/test_nan_inputs.py
+
+import importlib.util
+import math
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from services.analysis_service import TechnicalAnalysisService
+
+HAS_BROKER_DEPS = all(importlib.util.find_spec(name) is not None for name in ('yfinance', 'requests'))
+
+
+class _FrameProvider:
+    """Data provider stub that serves fixed history frames"""
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def get_historical_data(self, symbol, period):
+        return self.frames[symbol]
+
+
+def _history(closes):
+    closes = np.asarray(closes, dtype=np.float64)
+    return pd.DataFrame({
+        'Open': closes + 0.5,
+        'Close': closes,
+        'Volume': np.full(len(closes), 1000.0),
+    })
+
+
+class SellingPressureNanTest(unittest.TestCase):
+
+    def setUp(self):
+        gappy = _history([101.0, 100.5, 100.0, 99.0, 98.5, 97.0, 96.0, 95.5])
+        gappy.loc[4, 'Close'] = np.nan
+        gappy.loc[6, 'Volume'] = np.inf
+        self.service = TechnicalAnalysisService(_FrameProvider({
+            'GAPPY': gappy,
+            'DROPPED': gappy.drop(index=[4, 6]).reset_index(drop=True),
+            'EMPTY': _history([np.nan] * 6),
+        }))
+
+    def test_bars_with_non_finite_values_are_skipped(self):
+        # The window is filled from earlier finite bars, as if the bad bars were never there
+        score = self.service.calculate_selling_pressure_score('GAPPY', period_days=5)
+        self.assertTrue(math.isfinite(score))
+        self.assertEqual(score, self.service.calculate_selling_pressure_score('DROPPED', period_days=5))
+
+    def test_window_without_finite_bars_scores_zero(self):
+        self.assertEqual(self.service.calculate_selling_pressure_score('EMPTY'), 0.0)
+
+    def test_batch_matches_single_symbol_scores(self):
+        symbols = ['GAPPY', 'DROPPED', 'EMPTY']
+        scores = self.service.calculate_selling_pressure_batch(symbols, period_days=4)
+        self.assertTrue(np.isfinite(scores).all())
+        for symbol, score in zip(symbols, scores):
+            self.assertAlmostEqual(score, self.service.calculate_selling_pressure_score(symbol, period_days=4))
+
+
+@unittest.skipUnless(HAS_BROKER_DEPS, "yfinance and requests are required for the enhanced Fyers service")
+class RealizedVolatilityNanTest(unittest.TestCase):
+
+    def setUp(self):
+        from services.enhanced_fyers_service import _realized_vol, _realized_vol_batch
+        self.realized_vol = _realized_vol
+        self.realized_vol_batch = _realized_vol_batch
+
+    def test_non_finite_closes_are_skipped(self):
+        closes = np.array([100.0, 101.0, np.nan, 99.5, np.inf, 100.2, 0.0, 100.8])
+        finite = closes[np.isfinite(closes) & (closes > 0)]
+        expected = pd.Series(finite).pct_change().std() * (252 ** 0.5) * 100
+        self.assertAlmostEqual(self.realized_vol(closes), expected)
+
+    def test_too_few_finite_closes_reports_zero(self):
+        self.assertEqual(self.realized_vol(np.array([np.nan, 100.0, np.nan, 101.0, np.nan])), 0.0)
+
+    def test_batch_rows_stay_finite(self):
+        closes = np.array([[100.0, np.nan, 101.0, 102.0, 100.5],
+                           [np.nan, np.nan, np.nan, np.nan, np.nan]])
+        out = self.realized_vol_batch(closes, np.ones(2, dtype=np.bool_))
+        self.assertTrue(np.isfinite(out).all())
+        self.assertAlmostEqual(out[0], self.realized_vol(closes[0]))
+        self.assertEqual(out[1], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import hashlib
 import logging
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -8,6 +9,7 @@ class FyersAuthHelper:
     """Helper for Fyers authentication"""
 
     @staticmethod
+    @lru_cache(maxsize=8)
     def generate_auth_url(client_id: str, redirect_uri: str) -> str:
         """Generate authorization URL"""
         auth_url = "https://api-t1.fyers.in/api/v3/generate-authcode"
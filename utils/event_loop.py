@@ -0,0 +1,29 @@
+# utils/event_loop.py
+
+import asyncio
+import logging
+import sys
+from functools import lru_cache
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def uvloop_factory() -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    """Return uvloop's loop constructor when it is available"""
+    try:
+        import uvloop
+    except ImportError:
+        logger.debug("uvloop not available, using default asyncio event loop")
+        return None
+
+    return uvloop.new_event_loop
+
+
+def run_coroutine(coro):
+    """Run a coroutine to completion on uvloop if present, with eager tasks on Python 3.12+"""
+    with asyncio.Runner(loop_factory=uvloop_factory()) as runner:
+        if sys.version_info >= (3, 12):
+            runner.get_loop().set_task_factory(asyncio.eager_task_factory)
+        return runner.run(coro)
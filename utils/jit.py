@@ -0,0 +1,22 @@
+# utils/jit.py
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+    logger.debug("numba not available, numeric kernels run as plain Python")
+
+__all__ = ['NUMBA_AVAILABLE', 'njit', 'prange']
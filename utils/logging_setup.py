@@ -0,0 +1,123 @@
+# utils/logging_setup.py
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[QueueListener] = None
+
+
+class CachedFormatter(logging.Formatter):
+    """Formatter that reuses the formatted timestamp for all records within the same second"""
+
+    def __init__(self, fmt: Optional[str] = None):
+        super().__init__(fmt)
+        self._cached_time = (-1, '')
+
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        if datefmt:
+            return super().formatTime(record, datefmt)
+
+        second = int(record.created)
+        cached_second, cached_text = self._cached_time
+        if second != cached_second:
+            cached_text = time.strftime(self.default_time_format, self.converter(record.created))
+            self._cached_time = (second, cached_text)
+
+        return self.default_msec_format % (cached_text, record.msecs)
+
+
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler that batches writes, flushing every N records or on a short timer"""
+
+    def __init__(self, filename: str, flush_interval: float = 0.5, flush_records: int = 100,
+                 max_bytes: int = 10_000_000, backup_count: int = 5):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding='utf-8', delay=True)
+        self.flush_interval = flush_interval
+        self.flush_records = flush_records
+        self._flush_timer: Optional[threading.Timer] = None
+        self._pending = 0
+        self._size = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write the record to the buffered stream without flushing it"""
+        try:
+            msg = self.format(record) + self.terminator
+
+            # Track the file size locally; the base class seeks (and so flushes) on every record
+            if self.stream is None:
+                self.stream = self._open()
+                self._size = os.path.getsize(self.baseFilename)
+            if self.maxBytes > 0 and self._size + len(msg) >= self.maxBytes:
+                self.doRollover()
+                self.stream = self._open()
+                self._size = 0
+
+            self.stream.write(msg)
+            self._size += len(msg)
+            self._pending += 1
+
+            # Bursts flush by count; quiet periods are flushed by the timer
+            if self._pending >= self.flush_records:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self._flush_pending)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        super().flush()
+        self._pending = 0
+
+    def _flush_pending(self) -> None:
+        self.acquire()
+        try:
+            self._flush_timer = None
+            self.flush()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        finally:
+            self.release()
+        super().close()
+
+
+def configure_logging(log_file: str, level: int = logging.INFO) -> None:
+    """Route log records through a queue so file/console I/O happens off the event loop"""
+    global _listener
+
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+    formatter = CachedFormatter(LOG_FORMAT)
+
+    file_handler = BufferedRotatingFileHandler(log_file)
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    # The queue side only merges args into the message; the listener's handlers apply LOG_FORMAT
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=level, handlers=[queue_handler])
+
+    _listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import numpy as np
 from typing import Dict, List, Tuple
 from datetime import datetime, timedelta
 from services.fyers_service import FyersService
@@ -38,23 +39,22 @@ class MarketScanner:
         try:
             # Get quotes for all symbols
             symbols = list(self.scan_universe)
-            market_data = await self.fyers_service.get_quotes(symbols)
-
-            for symbol, data in market_data.items():
-                # Calculate gap percentage
-                gap_pct = ((data.open_price - data.previous_close) / data.previous_close) * 100
-
-                # Identify significant gaps
-                if abs(gap_pct) >= 1.0:  # 1% or more gap
-                    opportunity = {
-                        'symbol': symbol,
-                        'gap_type': 'GAP_UP' if gap_pct > 0 else 'GAP_DOWN',
-                        'gap_percentage': gap_pct,
-                        'current_price': data.current_price,
-                        'volume': data.volume,
-                        'opportunity_score': self._calculate_gap_score(data, gap_pct)
-                    }
-                    opportunities.append(opportunity)
+            quotes = await self.fyers_service.get_quotes(symbols)
+
+            # Identify significant gaps (1% or more) across all symbols at once
+            gaps = quotes.gap_percentage
+            for i in np.flatnonzero(np.abs(gaps) >= 1.0):
+                data = quotes.row(i)
+                gap_pct = float(gaps[i])
+                opportunity = {
+                    'symbol': data.symbol,
+                    'gap_type': 'GAP_UP' if gap_pct > 0 else 'GAP_DOWN',
+                    'gap_percentage': gap_pct,
+                    'current_price': data.current_price,
+                    'volume': data.volume,
+                    'opportunity_score': self._calculate_gap_score(data, gap_pct)
+                }
+                opportunities.append(opportunity)
 
             # Sort by opportunity score
             opportunities.sort(key=lambda x: x['opportunity_score'], reverse=True)